@@ -1,5 +1,28 @@
 config = {
     "Default_Sort_Mode" : "Node Type", # "Color", "Name", "Node Type"
+    "Auto_Expand_Limit" : 1000, # new rows are only expanded while the bundle has at most this many nodes
+    "Event_Debounce_Ms" : 100, # node events within this window are applied as one tree update
+    "Icon_Cache_Size" : 256, # icons kept alive for every open panel
+    "Brush_Cache_Size" : 1024, # color brushes kept alive for every open panel
+    "Default_Search_Mode" : "Contains", # "Contains", "Glob", "Regex", "Fuzzy"
+    "Search_Debounce_Ms" : 150, # wait for typing to pause before searching
+    "Progressive_Threshold" : 2000, # bundles with more nodes are built in time slices
+    "Build_Slice_Ms" : 15, # time a progressive build may take per event loop tick
+    "Preview_Debounce_Ms" : 250, # wait for typing to pause before previewing a smart bundle pattern
+    "Preview_Time_Limit_Ms" : 200, # a pattern preview stops after this long
+    "Preview_Max_Matches" : 20000, # or after this many matches
+    "Preview_Paths" : 20, # matched paths listed by the preview
+    "Preview_Warn_Count" : 5000, # warn when a pattern matches at least this many nodes
+    "Palette_Limit" : 50, # results shown by the quick open palette
+    "Palette_Time_Limit_Ms" : 40, # a quick open search shows what it found after this long
+    "Selection_Sync" : False, # mirror the network editor selection in the tree and back
+    "Selection_Sync_Ms" : 150, # selection changes within this window are synced as one
+    "Tree_Cache_Rows" : 50000, # rows of recently shown bundles kept built for instant switching, 0 rebuilds on every switch
+    "Bookmark_Store" : False, # keep bookmarks and their look in $HOUDINI_USER_PREF_DIR/hz_bookmark.db to paint the panel instantly
+    "Store_Save_Delay_Ms" : 2000, # wait for edits to settle before writing the store
+    "Startup_Timing" : False, # report import, construct and first paint times of each panel
+    "Profile" : False, # time panel operations and count hou calls, shown in a strip below the tree
+    "Profile_Log_Dir" : "", # where profile dumps go, $HOUDINI_TEMP_DIR when empty
     "shortcut" : {
         "Delete" : "Del",
         "Refresh" : "R",
@@ -8,39 +31,528 @@ config = {
         "Paste_Node" : "Ctrl+V",
         "Copy_As_ObjMerge_Relative" : "Ctrl+Shift+R",
         "Copy_As_OBjMerge_Absolute" : "Ctrl+Shift+C",
+        "Copy_As_Single_ObjMerge_Relative" : "Ctrl+Alt+R",
+        "Copy_As_Single_ObjMerge_Absolute" : "Ctrl+Alt+C",
         "Open_Parmeter" : "Ctrl+P", 
+        "Quick_Open" : "Ctrl+G",
+        "Palette_Bookmark" : "Ctrl+B", # bookmark the picked result without closing the palette
         "Close" : "Q"
     }
 
 }
 
+import time
+importStart = time.perf_counter()
+import os
 import hou
+import bisect
+from collections import OrderedDict
+from contextlib import contextmanager
 from PySide2 import QtWidgets, QtCore  
-from PySide2.QtGui import QColor, QBrush, QIcon, QKeySequence, QRegExpValidator
+from PySide2.QtGui import QColor, QBrush, QIcon, QPen, QKeySequence, QRegExpValidator
+from hz_bookmark_store import BookmarkStore
+from hz_bookmark_profile import Profiler, profiled, COUNTERS
+from hz_bookmark_core import (NodeCache, storeRecord, storedRecord, walkNodes, watchPattern, childPathsOf, sortKey, patternRoots, patternDepth,
+                              SearchIndex, NodeIndex, visiblePaths, FlagState, flagOf, withFlag, flagExclusive, applyFlag)
 
-class SortableItem(QtWidgets.QTreeWidgetItem):
-    def __lt__(self, other):
-        tree = self.treeWidget()
-        column = tree.sortColumn()
+# node events that change a row, and the events that change smart bundle membership
+ROW_EVENTS = (
+    hou.nodeEventType.NameChanged,
+    hou.nodeEventType.AppearanceChanged,
+    hou.nodeEventType.FlagChanged,
+    hou.nodeEventType.BeingDeleted
+)
+CHILD_EVENTS = (
+    hou.nodeEventType.ChildCreated,
+    hou.nodeEventType.ChildDeleted
+)
+# node events that keep the scene index of the quick open palette current
+INDEX_EVENTS = (hou.nodeEventType.NameChanged,) + CHILD_EVENTS
 
-        sort_mode = getattr(tree, 'sort_mode', 'name')
+class LRUCache(object):
+    # least recently used cache, shared by every Bookmark panel in the session
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
 
-        if sort_mode == 'Color':
-            color1 = self.background(column).color()
-            color2 = other.background(column).color()
+    def get(self, key, create):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        value = create(key)
+        self.entries[key] = value
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return value
 
-            hsv1 = (color1.hue(), color1.saturation(), color1.value())
-            hsv2 = (color2.hue(), color2.saturation(), color2.value())
+class TreeCache(object):
+    # built trees of the bundles a panel showed recently, the least recently shown are
+    # dropped once all cached trees together have more rows than the budget
+    def __init__(self, rows):
+        self.rows = rows
+        self.entries = OrderedDict()
 
-            return hsv1 < hsv2
-        
-        elif sort_mode == "Node Type":
-            value1 = self.data(column, QtCore.Qt.UserRole)
-            value2 = other.data(column, QtCore.Qt.UserRole)
-            return str(value1) < str(value2)
+    def put(self, name, entry):
+        # returns the dropped entries
+        self.entries[name] = entry
+        self.entries.move_to_end(name)
+        dropped = []
+        total = sum(len(cached.model.items) for cached in self.entries.values())
+        while self.entries and total > self.rows:
+            name, cached = self.entries.popitem(last=False)
+            total -= len(cached.model.items)
+            dropped.append(cached)
+        return dropped
+
+    def pop(self, name):
+        return self.entries.pop(name, None)
+
+    def clear(self):
+        dropped = list(self.entries.values())
+        self.entries = OrderedDict()
+        return dropped
+
+iconCache = LRUCache(config["Icon_Cache_Size"])
+brushCache = LRUCache(config["Brush_Cache_Size"])
+
+def cachedIcon(name):
+    return iconCache.get(name, lambda name: QIcon(hou.qt.Icon(name)))
+
+def cachedBrush(rgb):
+    return brushCache.get(rgb, lambda rgb: QBrush(QColor(*rgb)))
+
+class NodeItem(object):
+    # one row of the node tree, children are only created once the row is fetched
+    def __init__(self, name, path, parent=None):
+        self.name = name
+        self.nameKey = name.lower()
+        self.path = path
+        self.parent = parent
+        self.children = []
+        self.row = 0
+        self.fetched = False
+        self.record = None
+
+class NodeTreeModel(QtCore.QAbstractItemModel):
+    def __init__(self, parent=None, nodeCache=None):
+        super().__init__(parent)
+        self.root = NodeItem("", "")
+        # path -> row of every created item
+        self.items = {}
+        # path -> child paths of every path in the bundle, "" is the root
+        self.childPaths = {"": set()}
+        self.sortMode = "Name"
+        self.sortColumn = 0
+        self.sortOrder = QtCore.Qt.AscendingOrder
+        self.nodeCache = nodeCache if nodeCache is not None else NodeCache(hou)
+        self.profiler = None
+        self.flagState = FlagState()
+        # (mode, column, order) the rows are sorted by, rows are inserted in order
+        self.sortedAs = None
+
+    def itemFromIndex(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def indexFromItem(self, item, column=0):
+        if item is None or item is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(item.row, column, item)
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        item = self.itemFromIndex(parent)
+        if 0 <= row < len(item.children) and 0 <= column < 4:
+            return self.createIndex(row, column, item.children[row])
+        return QtCore.QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.indexFromItem(index.internalPointer().parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.itemFromIndex(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 4
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return False
+        return bool(self.childPaths.get(self.itemFromIndex(parent).path))
+
+    def canFetchMore(self, parent):
+        item = self.itemFromIndex(parent)
+        return not item.fetched and bool(self.childPaths.get(item.path))
+
+    @profiled
+    def fetchMore(self, parent):
+        item = self.itemFromIndex(parent)
+        if item.fetched:
+            return
+        item.fetched = True
+        children = [NodeItem(path.rsplit("/", 1)[1], path, item) for path in self.childPaths.get(item.path, ())]
+        if not children:
+            return
+        children.sort(key=self.sortKey, reverse=self.sortOrder == QtCore.Qt.DescendingOrder)
+        self.beginInsertRows(self.indexFromItem(item), 0, len(children) - 1)
+        item.children = children
+        for row, child in enumerate(children):
+            child.row = row
+            self.items[child.path] = child
+        self.endInsertRows()
+
+    def fetchPath(self, path):
+        # create the rows leading down to path
+        if not path or path not in self.childPaths:
+            return None
+        item = self.items.get(path)
+        if item is None:
+            parent_path = path.rsplit("/", 1)[0]
+            parent = self.fetchPath(parent_path) if parent_path else self.root
+            self.fetchMore(self.indexFromItem(parent))
+            item = self.items.get(path)
+        return item
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = index.internalPointer()
+        column = index.column()
+        if role == QtCore.Qt.DisplayRole:
+            return item.name if column == 0 else ""
+
+        record = self.recordOf(item)
+        if role == QtCore.Qt.DecorationRole:
+            if not record.editable:
+                return None
+            if column == 0:
+                return cachedIcon(record.icon)
+        elif role == QtCore.Qt.BackgroundRole:
+            if record.rgb:
+                return cachedBrush(record.rgb)
+        elif role == QtCore.Qt.ForegroundRole:
+            if column == 0 and not record.editable:
+                return cachedBrush((100, 100, 100))
+            if column == 0 and record.rgb and sum(record.rgb) // 3 > 128:
+                return cachedBrush((0, 0, 0))
+        elif role == QtCore.Qt.UserRole:
+            if record.editable:
+                return record.typeName if column == 0 else flagOf(record.flags, column)
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation != QtCore.Qt.Horizontal:
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return "Nodes" if section == 0 else ""
+        if role == QtCore.Qt.DecorationRole and section > 0:
+            return cachedIcon(["NETVIEW_display_flag", "NETVIEW_template_flag", "NETVIEW_selectable_template_flag"][section - 1])
+        return None
+
+    def recordOf(self, item):
+        # the record is only looked up once the row is painted or sorted
+        if item.record is None:
+            item.record = self.nodeCache.get(item.path)
+            self.flagState.update(item.record)
+        return item.record
+
+    def sortKey(self, item):
+        # keys are precomputed on the item and its record, name sorting never needs the record
+        record = None if self.sortMode == "Name" else self.recordOf(item)
+        return sortKey(self.sortMode, self.sortColumn, item.nameKey, record)
+
+    @profiled
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        # views sort again whenever the model is set, a cached tree is already sorted
+        if self.sortedAs == (self.sortMode, column, order):
+            return
+        self.sortedAs = (self.sortMode, column, order)
+        self.sortColumn = column
+        self.sortOrder = order
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        entries = [(index.internalPointer(), index.column()) for index in persistent]
+        for item in [self.root] + list(self.items.values()):
+            item.children.sort(key=self.sortKey, reverse=order == QtCore.Qt.DescendingOrder)
+            for row, child in enumerate(item.children):
+                child.row = row
+        self.changePersistentIndexList(persistent, [self.createIndex(item.row, col, item) for item, col in entries])
+        self.layoutChanged.emit()
+
+    def resort(self):
+        # sort keys of rows changed
+        self.sortedAs = None
+        self.sort(self.sortColumn, self.sortOrder)
+
+    @profiled
+    def reconcile(self, wanted, paths=None):
+        # diff the wanted paths against the rows, paths limits the restyle of existing rows
+        childPaths = childPathsOf(wanted)
+        oldChildPaths = self.childPaths
+        self.childPaths = childPaths
+
+        # remove rows no longer wanted, parents sort before their children
+        removed = set(path for path in self.items if path not in wanted)
+        for path in sorted(removed):
+            item = self.items.pop(path)
+            self.flagState.remove(path)
+            parent = item.parent
+            if parent.path in removed:
+                continue
+            self.beginRemoveRows(self.indexFromItem(parent), item.row, item.row)
+            del parent.children[item.row]
+            for row in range(item.row, len(parent.children)):
+                parent.children[row].row = row
+            self.endRemoveRows()
+
+        if paths is None:
+            self.nodeCache.clear()
+            paths = list(self.items)
+        self.restyle(paths)
+
+        self.insertRows(sorted(path for path in wanted if path not in oldChildPaths), oldChildPaths)
+
+    def extend(self, paths):
+        # add paths without removing any rows, used while a large bundle streams in
+        added = sorted(path for path in paths if path not in self.childPaths)
+        previous = {}
+        for path in added:
+            parent_path = path.rsplit("/", 1)[0]
+            if parent_path not in previous and parent_path in self.childPaths:
+                previous[parent_path] = bool(self.childPaths[parent_path])
+        for path in added:
+            self.childPaths[path] = set()
+            self.childPaths[path.rsplit("/", 1)[0]].add(path)
+        self.insertRows(added, previous)
+
+    def insertRows(self, paths, previous):
+        # insert rows under rows that are already fetched, the rest waits for fetchMore.
+        # previous tells whether a parent had children before, parents must come before their children
+        descending = self.sortOrder == QtCore.Qt.DescendingOrder
+        keys = {}
+        for path in paths:
+            parent_path, name = path.rsplit("/", 1)
+            parent = self.items.get(parent_path) if parent_path else self.root
+            if parent is None:
+                continue
+            if not parent.fetched:
+                had = previous.get(parent_path)
+                if had is None or had:
+                    continue
+                parent.fetched = True
+            item = NodeItem(name, path, parent)
+
+            # ascending sort keys of the siblings, kept up to date while inserting
+            if parent_path not in keys:
+                keys[parent_path] = [self.sortKey(child) for child in parent.children]
+                if descending:
+                    keys[parent_path].reverse()
+            siblingKeys = keys[parent_path]
+            key = self.sortKey(item)
+            if descending:
+                position = bisect.bisect_left(siblingKeys, key)
+                row = len(siblingKeys) - position
+            else:
+                position = row = bisect.bisect_right(siblingKeys, key)
+            siblingKeys.insert(position, key)
+
+            self.beginInsertRows(self.indexFromItem(parent), row, row)
+            parent.children.insert(row, item)
+            for i in range(row, len(parent.children)):
+                parent.children[i].row = i
+            self.items[path] = item
+            self.endInsertRows()
+
+    def setFlag(self, item, column, state, exclusive=False):
+        # update the cached flags of a row, exclusive flags are cleared on its sibling rows
+        rows = [item]
+        if exclusive:
+            rows += [self.items[path] for path in self.flagState.siblingsSet(item.path, column) if path in self.items]
+        for row in rows:
+            if row.record is None or flagOf(row.record.flags, column) == -1:
+                continue
+            row.record = self.nodeCache.put(withFlag(row.record, column, state if row is item else 0))
+            self.flagState.update(row.record)
+            index = self.indexFromItem(row, column)
+            self.dataChanged.emit(index, index)
+        if self.sortMode == "Node Type" and self.sortColumn == column:
+            self.resort()
+
+    def restyle(self, paths):
+        # reread rows that were already shown and resort if their sort key moved
+        resort = False
+        for path in paths:
+            self.nodeCache.invalidate(path)
+            item = self.items.get(path)
+            if item is None or item.record is None:
+                continue
+            record = self.nodeCache.get(path)
+            if record != item.record:
+                key = self.sortKey(item)
+                item.record = record
+                self.flagState.update(record)
+                resort = resort or key != self.sortKey(item)
+                self.dataChanged.emit(self.indexFromItem(item, 0), self.indexFromItem(item, 3))
+        if resort:
+            self.resort()
+
+class FlagDelegate(QtWidgets.QStyledItemDelegate):
+    # paints the flag columns straight from the flag bits of a row, so the model hands out
+    # no icon per cell and a flag change only repaints the cell
+    ICONS = ("SCENEGRAPH_active_off", "SCENEGRAPH_active_on")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pixmaps = {}
+
+    def pixmap(self, state, size):
+        key = (state, size)
+        if key not in self.pixmaps:
+            self.pixmaps[key] = cachedIcon(self.ICONS[state]).pixmap(size, size)
+        return self.pixmaps[key]
+
+    def paint(self, painter, option, index):
+        # background, selection and hover like any other cell
+        self.initStyleOption(option, index)
+        widget = option.widget
+        style = widget.style() if widget else QtWidgets.QApplication.style()
+        style.drawPrimitive(QtWidgets.QStyle.PE_PanelItemViewItem, option, painter, widget)
+
+        record = index.model().recordOf(index.internalPointer())
+        if not record.editable:
+            return
+        rect = option.rect
+        state = flagOf(record.flags, index.column())
+        if state == -1:
+            # the node has no such flag
+            painter.save()
+            painter.setPen(QPen(option.palette.color(option.palette.Disabled, option.palette.Text), 1))
+            painter.drawLine(rect.center().x() - 3, rect.center().y(), rect.center().x() + 3, rect.center().y())
+            painter.restore()
+            return
+        size = option.decorationSize.height()
+        pixmap = self.pixmap(state, size)
+        painter.drawPixmap(rect.x() + (rect.width() - size) // 2, rect.y() + (rect.height() - size) // 2, pixmap)
+
+class ProfileStrip(QtWidgets.QWidget):
+    # collapsible table of the profiler stats, refreshed while it is open
+    def __init__(self, profiler, logDir, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.logDir = logDir
+        self.revision = None
+
+        self.toggleButton = QtWidgets.QToolButton()
+        self.toggleButton.setText("Profile")
+        self.toggleButton.setCheckable(True)
+        self.toggleButton.setToolButtonStyle(QtCore.Qt.ToolButtonTextBesideIcon)
+        self.toggleButton.setArrowType(QtCore.Qt.RightArrow)
+        self.toggleButton.setAutoRaise(True)
+        self.toggleButton.toggled.connect(self.setExpanded)
+        self.resetButton = QtWidgets.QPushButton("Reset")
+        self.resetButton.clicked.connect(self.profiler.reset)
+        self.dumpButton = QtWidgets.QPushButton("Dump JSON")
+        self.dumpButton.clicked.connect(self.dump)
+        headerLayout = QtWidgets.QHBoxLayout()
+        headerLayout.addWidget(self.toggleButton)
+        headerLayout.addStretch()
+        headerLayout.addWidget(self.resetButton)
+        headerLayout.addWidget(self.dumpButton)
 
+        self.table = QtWidgets.QTableWidget(0, 5 + len(COUNTERS))
+        self.table.setHorizontalHeaderLabels(["Operation", "Calls", "Last ms", "Max ms", "Total ms"] + list(COUNTERS))
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self.table.setMaximumHeight(200)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(headerLayout)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        self.refreshTimer = QtCore.QTimer(self)
+        self.refreshTimer.setInterval(500)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.setExpanded(False)
+
+    def setExpanded(self, expanded):
+        self.toggleButton.setArrowType(QtCore.Qt.DownArrow if expanded else QtCore.Qt.RightArrow)
+        self.table.setVisible(expanded)
+        self.resetButton.setVisible(expanded)
+        self.dumpButton.setVisible(expanded)
+        if expanded:
+            self.refresh()
+            self.refreshTimer.start()
         else:
-            return self.text(column).lower() < other.text(column).lower()
+            self.refreshTimer.stop()
+
+    def refresh(self):
+        # counts are of the last call, hou calls of nested operations are included
+        if self.revision == self.profiler.revision:
+            return
+        self.revision = self.profiler.revision
+        stats = self.profiler.stats
+        self.table.setRowCount(len(stats))
+        for row, (name, stat) in enumerate(stats.items()):
+            values = [name, stat["calls"], f"{stat['lastMs']:.1f}", f"{stat['maxMs']:.1f}", f"{stat['totalMs']:.1f}"]
+            values += [stat["last"][key] for key in COUNTERS]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(str(value)))
+
+    def dump(self):
+        directory = self.logDir or hou.getenv("HOUDINI_TEMP_DIR")
+        path = os.path.join(directory, time.strftime("hz_bookmark_profile_%Y%m%d_%H%M%S.json"))
+        self.profiler.dump(path, hip=hou.hipFile.path(), houdini=hou.applicationVersionString())
+        hou.ui.displayMessage(f"Profile written to {path}")
+
+# the node type filters of BundleConfigDialog as checks on a node, for the match preview
+FILTER_TESTS = {
+    "NoFilter": lambda node: True,
+    "Obj": lambda node: node.type().category().name() == "Object",
+    "Sop": lambda node: node.type().category().name() == "Sop",
+    "Rop": lambda node: node.type().category().name() == "Driver",
+    "ObjGeometry": lambda node: node.type().category().name() == "Object" and node.type().name() == "geo",
+    "ObjLight": lambda node: node.type().category().name() == "Object" and "light" in node.type().name(),
+}
+
+def previewMatches(pattern, test, maxMatches, seconds, shown):
+    # nodes a smart bundle pattern matches, walking only below the static part of the pattern
+    # and no deeper than it reaches. Returns the first shown paths, the match count and
+    # whether the walk finished within maxMatches and seconds
+    roots = patternRoots(pattern)
+    # nested roots are walked through their parent root, parents sort first
+    walked = []
+    for root in sorted(set(roots)):
+        if not any(root.startswith(parent.rstrip("/") + "/") for parent in walked):
+            walked.append(root)
+    roots = walked
+    depth = patternDepth(pattern)
+    deadline = time.perf_counter() + seconds
+    stack = [node for node in hou.nodes(roots) if node is not None] if roots else []
+    paths = []
+    count = 0
+    visited = 0
+    while stack:
+        node = stack.pop()
+        path = node.path()
+        if hou.patternMatch(pattern, path, path_match=True) and test(node):
+            count += 1
+            if len(paths) < shown:
+                paths.append(path)
+            if count >= maxMatches:
+                return paths, count, False
+        if depth is None or path.count("/") < depth:
+            stack.extend(reversed(node.children()))
+        visited += 1
+        if not visited % 256 and time.perf_counter() > deadline:
+            return paths, count, False
+    return paths, count, True
 
 class BundleConfigDialog(QtWidgets.QDialog):
     def __init__(self, parent=None, name = None, pattern = None, filter = hou.nodeTypeFilter.NoFilter, windowName = ""):
@@ -50,9 +562,9 @@ class BundleConfigDialog(QtWidgets.QDialog):
 
         self.pattern = pattern
         if not pattern:
-            self.setWindowIcon(hou.qt.Icon("DATATYPES_bundle"))
+            self.setWindowIcon(cachedIcon("DATATYPES_bundle"))
         else:
-            self.setWindowIcon(hou.qt.Icon("DATATYPES_bundle_smart"))
+            self.setWindowIcon(cachedIcon("DATATYPES_bundle_smart"))
             
         layout = QtWidgets.QFormLayout(self)
 
@@ -73,6 +585,17 @@ class BundleConfigDialog(QtWidgets.QDialog):
         self.filterTypeCombo.addItems(filterNames)
         self.filterTypeCombo.setCurrentIndex(filterIndex)
 
+        # Match Preview
+        self.previewLabel = QtWidgets.QLabel()
+        self.previewList = QtWidgets.QListWidget()
+        self.previewList.setMaximumHeight(120)
+        self.previewTimer = QtCore.QTimer(self)
+        self.previewTimer.setSingleShot(True)
+        self.previewTimer.setInterval(config["Preview_Debounce_Ms"])
+        self.previewTimer.timeout.connect(self.updatePreview)
+        self.patternEdit.textChanged.connect(lambda: self.previewTimer.start())
+        self.filterTypeCombo.currentIndexChanged.connect(lambda: self.previewTimer.start())
+
         # Buttons
         buttonBox = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
         buttonBox.accepted.connect(self.accept)
@@ -82,8 +605,34 @@ class BundleConfigDialog(QtWidgets.QDialog):
         if pattern:
             layout.addRow("Bundle Pattern:", self.patternEdit)
             layout.addRow("Node Filter:", self.filterTypeCombo)
+            layout.addRow("Matches:", self.previewLabel)
+            layout.addRow(self.previewList)
+            self.previewTimer.start()
         layout.addRow(buttonBox)
 
+    def updatePreview(self):
+        # bounded evaluation of the pattern, the bundle itself is only evaluated once accepted
+        self.previewTimer.stop()
+        pattern = self.patternEdit.text()
+        test = FILTER_TESTS[self.filterObjects[self.filterTypeCombo.currentIndex()].name()]
+        start = time.perf_counter()
+        paths, count, complete = previewMatches(pattern, test, config["Preview_Max_Matches"],
+                                                config["Preview_Time_Limit_Ms"] / 1000.0, config["Preview_Paths"])
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.previewList.clear()
+        self.previewList.addItems(paths)
+        if complete:
+            text = f"{count} nodes ({elapsed:.0f} ms)"
+        elif count >= config["Preview_Max_Matches"]:
+            text = f"{count}+ nodes, stopped counting"
+        else:
+            text = f"at least {count} nodes, stopped after {elapsed:.0f} ms"
+        large = count >= config["Preview_Warn_Count"] or not complete
+        if large:
+            text += " - large bundle, the tree will be slow to build"
+        self.previewLabel.setText(text)
+        self.previewLabel.setStyleSheet("color: #e8a33d;" if large else "")
+
     def getValues(self):
         if self.pattern:
             self.pattern = self.patternEdit.text()
@@ -94,6 +643,7 @@ class BundleConfigDialog(QtWidgets.QDialog):
             self.filterObjects[self.filterTypeCombo.currentIndex()]
         )
     def accept(self):
+        self.previewTimer.stop()
         name = self.nameEdit.text()
         if not name:
             QtWidgets.QMessageBox.warning(self, "Invalid Name", "Name cannot be empty.")
@@ -103,26 +653,457 @@ class BundleConfigDialog(QtWidgets.QDialog):
             return
         super().accept()
 
+class QuickOpenDialog(QtWidgets.QDialog):
+    # jump to any node of every bundle or of the whole scene, ranked by NodeIndex.search
+    def __init__(self, panel):
+        super().__init__(panel)
+        self.panel = panel
+        self.config = panel.config
+        self.setWindowTitle("Quick Open")
+        self.setMinimumWidth(500)
+        self.setWindowIcon(cachedIcon("BUTTONS_search"))
+
+        self.searchLine = QtWidgets.QLineEdit()
+        self.searchLine.setPlaceholderText("node name, parent/name or type")
+        self.searchLine.textChanged.connect(lambda: self.search())
+        self.scopeComboBox = QtWidgets.QComboBox()
+        self.scopeComboBox.addItems(["Bundles", "Scene"])
+        self.scopeComboBox.currentIndexChanged.connect(lambda: self.setScope())
+        self.results = QtWidgets.QListWidget()
+        self.results.itemActivated.connect(lambda item: self.jump())
+        self.status = QtWidgets.QLabel()
+
+        # the scene index is built in time slices the first time it is needed
+        self.buildTimer = QtCore.QTimer(self)
+        self.buildTimer.setInterval(0)
+        self.buildTimer.timeout.connect(self.buildStep)
+
+        searchLayout = QtWidgets.QHBoxLayout()
+        searchLayout.addWidget(self.searchLine)
+        searchLayout.addWidget(self.scopeComboBox)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(searchLayout)
+        layout.addWidget(self.results)
+        layout.addWidget(self.status)
+
+        key_seq = self.config["shortcut"].get("Palette_Bookmark")
+        if key_seq:
+            shortcut = QtWidgets.QShortcut(QKeySequence(key_seq), self)
+            shortcut.activated.connect(self.bookmark)
+        self.setScope()
+
+    def index(self):
+        if self.scopeComboBox.currentText() == "Scene":
+            return self.panel.service.scene().index
+        return self.panel.service.bundles()
+
+    def setScope(self):
+        if self.scopeComboBox.currentText() == "Scene" and not self.panel.service.scene().ready:
+            self.buildTimer.start()
+        else:
+            self.buildTimer.stop()
+        self.search()
+
+    def buildStep(self):
+        scene = self.panel.service.scene()
+        if scene.step(self.config["Build_Slice_Ms"] / 1000.0):
+            self.buildTimer.stop()
+            self.search()
+        else:
+            self.status.setText(f"Indexing scene, {len(scene.index)} nodes so far")
+
+    @profiled
+    def search(self):
+        index = self.index()
+        start = time.perf_counter()
+        paths = index.search(self.searchLine.text(), self.config["Palette_Limit"], self.config["Palette_Time_Limit_Ms"] / 1000.0)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.results.clear()
+        for path in paths:
+            item = QtWidgets.QListWidgetItem(f"{path}  ({index.types[path]})")
+            item.setData(QtCore.Qt.UserRole, path)
+            self.results.addItem(item)
+        if paths:
+            self.results.setCurrentRow(0)
+        if not self.buildTimer.isActive():
+            self.status.setText(f"{len(paths)} of {len(index)} nodes, {elapsed:.1f} ms")
+
+    @property
+    def profiler(self):
+        return self.panel.profiler
+
+    def currentPath(self):
+        item = self.results.currentItem()
+        return item.data(QtCore.Qt.UserRole) if item else None
+
+    def jump(self):
+        path = self.currentPath()
+        if path:
+            self.accept()
+            self.panel.findPath(path)
+
+    def bookmark(self):
+        path = self.currentPath()
+        if path:
+            self.panel.ingestPaths(path)
+            self.status.setText(f"Bookmarked {path}")
+
+    def keyPressEvent(self, event):
+        # the search line keeps the focus, arrows move through the results
+        key = event.key()
+        if key in (QtCore.Qt.Key_Up, QtCore.Qt.Key_Down):
+            row = self.results.currentRow() + (1 if key == QtCore.Qt.Key_Down else -1)
+            if 0 <= row < self.results.count():
+                self.results.setCurrentRow(row)
+        elif key in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+            self.jump()
+        else:
+            super().keyPressEvent(event)
+
+    def done(self, result):
+        self.buildTimer.stop()
+        super().done(result)
+
+class BundleScan(object):
+    # one evaluation of a bundle, wanted and watched are filled in by the first panel that walks it
+    def __init__(self, key, nodes, roots, watched):
+        self.key = key
+        self.nodes = nodes
+        self.roots = roots
+        self.wanted = None
+        self.watched = watched
+        self.stale = False
+
+class CachedTree(object):
+    # the tree of a bundle while its panel shows another one, scan is the evaluation it was
+    # built from and paths the rows node events restyled since
+    def __init__(self, model, scan, expanded, top, searchSource, searchPaths):
+        self.model = model
+        self.scan = scan
+        self.expanded = expanded
+        self.top = top
+        self.searchSource = searchSource
+        self.searchPaths = searchPaths
+        self.paths = set()
+
+class SceneIndex(object):
+    # NodeIndex of every node in the scene, walked in time slices on first use and kept
+    # current through name and child callbacks on every indexed node
+    def __init__(self):
+        self.index = NodeIndex()
+        self.walk = None
+        self.ready = False
+        self.callbackNodes = {}
+        self.muted = False
+
+    def step(self, seconds):
+        # index for a while, returns True once the whole scene is indexed
+        if self.ready:
+            return True
+        if self.walk is None:
+            self.walk = self.walkNodes(hou.node("/"))
+        deadline = time.perf_counter() + seconds
+        for _ in self.walk:
+            if time.perf_counter() > deadline:
+                return False
+        self.walk = None
+        self.ready = True
+        return True
+
+    def walkNodes(self, root):
+        self.watch(root)
+        stack = [root]
+        while stack:
+            for child in stack.pop().children():
+                self.index.add(child.path(), child.type().name(), child.sessionId())
+                self.watch(child)
+                stack.append(child)
+                yield
+
+    def watch(self, node):
+        sid = node.sessionId()
+        if sid not in self.callbackNodes:
+            node.addEventCallback(INDEX_EVENTS, self.onNodeEvent)
+            self.callbackNodes[sid] = node
+
+    def onNodeEvent(self, event_type, node, **kwargs):
+        if self.muted:
+            return
+        if event_type == hou.nodeEventType.NameChanged:
+            old = self.index.pathOf(node.sessionId())
+            if old:
+                self.index.rename(old, node.path())
+        elif event_type == hou.nodeEventType.ChildCreated:
+            child = kwargs["child_node"]
+            self.index.add(child.path(), child.type().name(), child.sessionId())
+            for added in self.walkNodes(child):
+                pass
+        else:
+            # the deleted child may already be gone, the children of its parent are compared instead
+            parent_path = node.path()
+            alive = set(child.path() for child in node.children())
+            for path in list(self.index.children.get(parent_path, ())):
+                if path not in alive:
+                    for gone in self.index.subtree(path):
+                        self.callbackNodes.pop(self.index.sessionIds.get(gone), None)
+                    self.index.remove(path)
+
+    def clear(self):
+        for node in self.callbackNodes.values():
+            try:
+                node.removeEventCallback(INDEX_EVENTS, self.onNodeEvent)
+            except (hou.ObjectWasDeleted, hou.OperationFailed):
+                pass
+        self.callbackNodes = {}
+        self.index = NodeIndex()
+        self.walk = None
+        self.ready = False
+
+class BundleService(object):
+    # bundle scans, node metadata and node event callbacks shared by every Bookmark panel of
+    # the session. Panels subscribe to the bundle they show and get its node events forwarded
+    def __init__(self):
+        self.nodeCache = NodeCache(hou)
+        self.subscribers = {}
+        # panel -> names of the bundles it keeps cached trees of, they stay watched
+        self.cached = {}
+        self.scans = {}
+        # node event callbacks, sessionId -> (node, event types)
+        self.callbackNodes = {}
+        # name -> (scan, watched) the callbacks were last synced with
+        self.synced = {}
+        self.sceneIndex = None
+        # members of every bundle for the quick open palette, sessionId -> number of bundles
+        # holding it and name -> member sessionIds, staleMembers are indexed again on next use
+        self.bundleIndex = None
+        self.memberCounts = {}
+        self.bundleMembers = {}
+        self.staleMembers = set()
+        self.muted = False
+        self.resetting = False
+
+    def scene(self):
+        # the scene index of the quick open palette, shared by every panel
+        if self.sceneIndex is None:
+            self.sceneIndex = SceneIndex()
+        return self.sceneIndex
+
+    def dropScene(self):
+        if self.sceneIndex is not None:
+            self.sceneIndex.clear()
+            self.sceneIndex = None
+        self.bundleIndex = None
+        self.memberCounts = {}
+        self.bundleMembers = {}
+        self.staleMembers = set()
+
+    def bundles(self):
+        # the bundle index of the quick open palette, built on first use. Scans and membership
+        # changes update the bundles they touch, renames and deletions update every bundle
+        if self.bundleIndex is None:
+            self.bundleIndex = NodeIndex()
+            for bundle in hou.nodeBundles():
+                self.indexMembers(bundle.name(), bundle.nodes())
+        stale, self.staleMembers = self.staleMembers, set()
+        for name in stale:
+            bundle = hou.nodeBundle(name)
+            self.indexMembers(name, bundle.nodes() if bundle else ())
+        return self.bundleIndex
+
+    def indexMembers(self, name, nodes):
+        # a node stays in the bundle index while any bundle holds it
+        if self.bundleIndex is None:
+            return
+        members = {node.sessionId(): node for node in nodes}
+        old = self.bundleMembers.pop(name, set())
+        if members:
+            self.bundleMembers[name] = set(members)
+        for sid in old.difference(members):
+            self.memberCounts[sid] -= 1
+            if not self.memberCounts[sid]:
+                del self.memberCounts[sid]
+                path = self.bundleIndex.pathOf(sid)
+                if path:
+                    self.bundleIndex.discard(path)
+        for sid, node in members.items():
+            if sid not in old:
+                self.memberCounts[sid] = self.memberCounts.get(sid, 0) + 1
+            # new members and members that moved with a renamed parent
+            path = node.path()
+            indexed = self.bundleIndex.pathOf(sid)
+            if indexed != path:
+                if indexed:
+                    self.bundleIndex.discard(indexed)
+                self.bundleIndex.add(path, node.type().name(), sid)
+        self.staleMembers.discard(name)
+
+    def reset(self):
+        # a hip file load replaces the scene, scans, records and callbacks are dropped once per
+        # load although every panel reports it
+        if self.resetting:
+            return
+        self.resetting = True
+        QtCore.QTimer.singleShot(0, lambda: setattr(self, "resetting", False))
+        for node, types in self.callbackNodes.values():
+            try:
+                node.removeEventCallback(types, self.onNodeEvent)
+            except (hou.ObjectWasDeleted, hou.OperationFailed):
+                pass
+        self.callbackNodes = {}
+        self.scans = {}
+        self.synced = {}
+        self.nodeCache.clear()
+        self.dropScene()
+
+    @contextmanager
+    def mute(self):
+        # drops the node events of throwaway nodes a panel creates and destroys right away, like
+        # the clipboard network, they would only make the scans stale and churn the scene index
+        self.muted = True
+        if self.sceneIndex is not None:
+            self.sceneIndex.muted = True
+        try:
+            yield
+        finally:
+            self.muted = False
+            if self.sceneIndex is not None:
+                self.sceneIndex.muted = False
+
+    def subscribe(self, panel, name):
+        self.subscribers[panel] = name
+
+    def unsubscribe(self, panel):
+        self.subscribers.pop(panel, None)
+        self.cached.pop(panel, None)
+        self.syncCallbacks()
+        if not self.subscribers:
+            # the scene index callbacks on every node only serve open panels
+            self.dropScene()
+
+    def cache(self, panel, names):
+        self.cached[panel] = set(names)
+
+    def scan(self, bundle):
+        # bundles are only evaluated again after a membership change or an explicit refresh
+        name = bundle.name()
+        pattern = bundle.pattern()
+        key = (pattern, bundle.filter())
+        scan = self.scans.get(name)
+        if scan is None or scan.stale or scan.key != key:
+            # the old callbacks stay until the new scan is walked, those of deleted nodes are dropped
+            watched = {}
+            if scan:
+                watched = {sid: entry for sid, entry in scan.watched.items() if hou.nodeBySessionId(sid) is not None}
+            scan = self.scans[name] = BundleScan(key, bundle.nodes(), patternRoots(pattern) if pattern else [], watched)
+            self.indexMembers(name, scan.nodes)
+        return scan
+
+    def invalidate(self, name):
+        scan = self.scans.get(name)
+        if scan:
+            scan.stale = True
+        if self.bundleIndex is not None:
+            self.staleMembers.add(name)
+
+    def bundleChanged(self, name, source=None):
+        # membership edited through a panel, the other panels showing the bundle refresh
+        self.invalidate(name)
+        for panel, subscribed in list(self.subscribers.items()):
+            if subscribed == name and panel is not source:
+                panel.onBundleChanged()
+
+    def syncCallbacks(self):
+        # one callback per node for everything the subscribed and cached bundles watch
+        names = set(self.subscribers.values()).union(*self.cached.values())
+        for name in list(self.scans):
+            if name not in names:
+                del self.scans[name]
+        synced = {name: (scan, scan.watched) for name, scan in self.scans.items()}
+        if synced.keys() == self.synced.keys() and all(
+                synced[name][0] is self.synced[name][0] and synced[name][1] is self.synced[name][1] for name in synced):
+            return
+        self.synced = synced
+        watched = {}
+        for scan in self.scans.values():
+            for sid, (node, types) in scan.watched.items():
+                if sid in watched and watched[sid][1] != types:
+                    types = tuple(OrderedDict.fromkeys(watched[sid][1] + types))
+                watched[sid] = (node, types)
+
+        for sid, (node, types) in list(self.callbackNodes.items()):
+            if sid in watched and watched[sid][1] == types:
+                continue
+            try:
+                node.removeEventCallback(types, self.onNodeEvent)
+            except (hou.ObjectWasDeleted, hou.OperationFailed):
+                pass
+            del self.callbackNodes[sid]
+        for sid, (node, types) in watched.items():
+            if sid not in self.callbackNodes:
+                try:
+                    node.addEventCallback(types, self.onNodeEvent)
+                except (hou.ObjectWasDeleted, hou.OperationFailed):
+                    continue
+                self.callbackNodes[sid] = (node, types)
+
+    def onNodeEvent(self, event_type, node, **kwargs):
+        if self.muted:
+            return
+        self.nodeCache.invalidateNode(node)
+        sid = node.sessionId()
+        membership = event_type not in (hou.nodeEventType.AppearanceChanged, hou.nodeEventType.FlagChanged)
+        deleted = event_type == hou.nodeEventType.BeingDeleted
+        if deleted:
+            self.callbackNodes.pop(sid, None)
+        if self.bundleIndex is not None and (deleted or event_type == hou.nodeEventType.NameChanged):
+            # members of any bundle may sit below the node, unwatched bundles included
+            self.staleMembers.update(self.bundleMembers)
+        affected = set()
+        for name, scan in self.scans.items():
+            if sid in scan.watched:
+                affected.add(name)
+                scan.stale = scan.stale or membership
+                if membership and self.bundleIndex is not None:
+                    self.staleMembers.add(name)
+                if deleted:
+                    # cached scans are synced again later, they must not hand the node back
+                    del scan.watched[sid]
+        for panel, name in list(self.subscribers.items()):
+            if name in affected:
+                panel.onNodeEvent(event_type, node, **kwargs)
+        for panel, names in list(self.cached.items()):
+            for name in names & affected:
+                panel.onCachedNodeEvent(name, event_type, node)
+
+service = None
+
+def bundleService():
+    global service
+    if service is None:
+        service = BundleService()
+    return service
+
 class Bookmark(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
+        constructStart = time.perf_counter()
 
         # bundle layout
         self.bundleLayout = QtWidgets.QHBoxLayout()
         self.bundleComboBox = QtWidgets.QComboBox()
         self.bundleComboBox.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
-        self.bundleComboBox.currentIndexChanged.connect(self.updateTree)
+        self.bundleComboBox.currentIndexChanged.connect(lambda: self.updateTree(paths=(), progressive=True))
         self.addBundle_btn = QtWidgets.QPushButton()
-        self.addBundle_btn.setIcon(hou.qt.Icon("DATATYPES_bundle"))
+        self.addBundle_btn.setIcon(cachedIcon("DATATYPES_bundle"))
         self.addBundle_btn.clicked.connect(lambda: self.addBundle(pattern=None))
         self.addSmartBundle_btn = QtWidgets.QPushButton()
-        self.addSmartBundle_btn.setIcon(hou.qt.Icon("DATATYPES_bundle_smart"))
+        self.addSmartBundle_btn.setIcon(cachedIcon("DATATYPES_bundle_smart"))
         self.addSmartBundle_btn.clicked.connect(lambda: self.addBundle(pattern="/obj/*",windowName = "add smart node bundle"))
         self.renameBundle_btn = QtWidgets.QPushButton()
-        self.renameBundle_btn.setIcon(hou.qt.Icon("SCENEGRAPH_collection_lights_editable.svg"))
+        self.renameBundle_btn.setIcon(cachedIcon("SCENEGRAPH_collection_lights_editable.svg"))
         self.renameBundle_btn.clicked.connect(self.editBundle)
         self.deleteBundle_btn = QtWidgets.QPushButton()
-        self.deleteBundle_btn.setIcon(hou.qt.Icon("BUTTONS_delete"))
+        self.deleteBundle_btn.setIcon(cachedIcon("BUTTONS_delete"))
         self.deleteBundle_btn.clicked.connect(self.removeBundle)
         self.addBundle_btn.setToolTip("Add a new bundle")
         self.addSmartBundle_btn.setToolTip("Add a smart bundle")
@@ -135,55 +1116,128 @@ class Bookmark(QtWidgets.QWidget):
         self.bundleLayout.addWidget(self.deleteBundle_btn)
 
         # search bar
+        self.searchLayout = QtWidgets.QHBoxLayout()
         self.searchLine = hou.qt.SearchLineEdit()
-        self.searchLine.textChanged.connect(self.searchItem)
+        self.searchLine.textChanged.connect(lambda: self.searchTimer.start())
+        self.searchModeComboBox = QtWidgets.QComboBox()
+        self.searchModeComboBox.addItems(["Contains", "Glob", "Regex", "Fuzzy"])
+        self.searchModeComboBox.setToolTip("Search mode, a query with / matches the full path")
+        self.searchModeComboBox.currentIndexChanged.connect(lambda: self.searchItem())
+        self.searchTypeCheckBox = QtWidgets.QCheckBox("Type")
+        self.searchTypeCheckBox.setToolTip("Also match node type names")
+        self.searchTypeCheckBox.toggled.connect(lambda: self.searchItem())
+        self.searchLayout.addWidget(self.searchLine)
+        self.searchLayout.addWidget(self.searchModeComboBox)
+        self.searchLayout.addWidget(self.searchTypeCheckBox)
 
         # node tree
-        self.nodeTree = QtWidgets.QTreeWidget()
+        self.service = bundleService()
+        self.nodeModel = self.newTreeModel()
+        self.nodeTree = QtWidgets.QTreeView()
+        self.nodeTree.setModel(self.nodeModel)
+        self.nodeTree.selectionModel().selectionChanged.connect(self.onTreeSelectionChanged)
+        self.nodeTree.setUniformRowHeights(True)
         self.nodeTree.setAlternatingRowColors(True)
         self.nodeTree.setExpandsOnDoubleClick(False)
         self.nodeTree.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        self.nodeTree.itemDoubleClicked.connect(self.findNode)
+        self.nodeTree.doubleClicked.connect(lambda index: self.findNode(index.internalPointer(), index.column()))
         self.nodeTree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.nodeTree.setSortingEnabled(True)
-        self.nodeTree.setColumnCount(4)
-        self.nodeTree.headerItem().setText(0,"Nodes")
-        self.nodeTree.headerItem().setText(1,"")
-        self.nodeTree.headerItem().setText(2,"")
-        self.nodeTree.headerItem().setText(3,"")
-        self.nodeTree.headerItem().setIcon(1,hou.qt.Icon("NETVIEW_display_flag"))
-        self.nodeTree.headerItem().setIcon(2,hou.qt.Icon("NETVIEW_template_flag"))
-        self.nodeTree.headerItem().setIcon(3,hou.qt.Icon("NETVIEW_selectable_template_flag"))
+
+        # progress of time sliced builds
+        self.buildProgress = QtWidgets.QProgressBar()
+        self.buildProgress.setTextVisible(False)
+        self.buildProgress.setMaximumHeight(4)
+        self.buildProgress.hide()
+        self.treeBuild = None
+        self.bundleSize = 0
         
         # node tree header
         header = self.nodeTree.header()
         header.setMinimumSectionSize(20)
         header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)  
+        self.flagDelegate = FlagDelegate(self.nodeTree)
         for i in range(1, 4):
             header.setSectionResizeMode(i, QtWidgets.QHeaderView.Fixed)
             self.nodeTree.setColumnWidth(i, 25)
+            self.nodeTree.setItemDelegateForColumn(i, self.flagDelegate)
         header.setStretchLastSection(False)
 
         # right click menu
         self.nodeTree.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.nodeTree.customContextMenuRequested.connect(self.openMenu)
-        self.nodeTree.itemClicked.connect(self.toggleColumnState)
-        
+        self.nodeTree.clicked.connect(lambda index: self.toggleColumnState(index.internalPointer(), index.column()))
+        self.searchVisible = None
+        self.searchSource = None
+        self.searchPaths = None
+
+        # node events forwarded by the bundle service
+        self.pendingPaths = set()
+        self.pendingMembership = False
+        self.batching = False
+
         # load config
         self.config = config
-        self.initBundle()
-        self.updateTree()
+        # opt-in profiling of panel operations
+        self.profiler = None
+        self.profileStrip = None
+        if self.config["Profile"]:
+            self.profiler = Profiler(hou)
+            self.profiler.start()
+            self.nodeModel.profiler = self.profiler
+            self.profileStrip = ProfileStrip(self.profiler, self.config["Profile_Log_Dir"])
+
+        self.eventTimer = QtCore.QTimer(self)
+        self.eventTimer.setSingleShot(True)
+        self.eventTimer.setInterval(self.config["Event_Debounce_Ms"])
+        self.eventTimer.timeout.connect(self.flushNodeEvents)
+        self.searchTimer = QtCore.QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(self.config["Search_Debounce_Ms"])
+        self.searchTimer.timeout.connect(self.searchItem)
+        self.buildTimer = QtCore.QTimer(self)
+        self.buildTimer.setInterval(0)
+        self.buildTimer.timeout.connect(self.buildStep)
+        # optional selection sync, both directions are throttled and guarded against echoes
+        self.selectionSync = self.config["Selection_Sync"]
+        self.selectionNodes = {}
+        self.selectionPushing = False
+        self.selectionPulling = False
+        self.pullTimer = QtCore.QTimer(self)
+        self.pullTimer.setSingleShot(True)
+        self.pullTimer.setInterval(self.config["Selection_Sync_Ms"])
+        self.pullTimer.timeout.connect(self.pullSelection)
+        self.pushTimer = QtCore.QTimer(self)
+        self.pushTimer.setSingleShot(True)
+        self.pushTimer.setInterval(self.config["Selection_Sync_Ms"])
+        self.pushTimer.timeout.connect(self.pushSelection)
+        # trees of recently shown bundles, treeScan is the evaluation the shown tree was built from
+        self.treeCache = TreeCache(self.config["Tree_Cache_Rows"])
+        self.treeName = None
+        self.treeScan = None
+        self.searchModeComboBox.setCurrentText(self.config["Default_Search_Mode"])
         self.configShortcut()
         self.setSortMode(self.config["Default_Sort_Mode"])
-        self.nodeTree.expandAll()
+
+        # optional disk store, paints the last known tree before the scene is read
+        self.store = BookmarkStore() if self.config["Bookmark_Store"] else None
+        self.storeTimer = QtCore.QTimer(self)
+        self.storeTimer.setSingleShot(True)
+        self.storeTimer.setInterval(self.config["Store_Save_Delay_Ms"])
+        self.storeTimer.timeout.connect(self.saveSnapshot)
+        self.nodeBundle = None
+        self.populated = False
 
         # layout
         self.mainLayout = QtWidgets.QVBoxLayout()
         self.treelayout = QtWidgets.QHBoxLayout()
         self.treelayout.addWidget(self.nodeTree)
         self.mainLayout.addLayout(self.bundleLayout)
-        self.mainLayout.addWidget(self.searchLine)
+        self.mainLayout.addLayout(self.searchLayout)
+        self.mainLayout.addWidget(self.buildProgress)
         self.mainLayout.addLayout(self.treelayout)
+        if self.profileStrip:
+            self.mainLayout.addWidget(self.profileStrip)
 
         # self.test_btn = QtWidgets.QPushButton("test")
         # self.test_btn.clicked.connect(self.test)
@@ -192,6 +1246,31 @@ class Bookmark(QtWidgets.QWidget):
         self.setLayout(self.mainLayout)
         self.setAcceptDrops(True)
         self.showLayout()
+        self.startupTimes = {"import": importTime, "construct": time.perf_counter() - constructStart}
+
+    def showEvent(self, event):
+        # the tree is filled once the empty panel is on screen
+        super().showEvent(event)
+        if not self.populated:
+            self.populated = True
+            QtCore.QTimer.singleShot(0, self.populate)
+
+    @profiled
+    def populate(self):
+        populateStart = time.perf_counter()
+        self.bundleComboBox.blockSignals(True)
+        self.initBundle()
+        self.bundleComboBox.blockSignals(False)
+        if self.paintSnapshot():
+            QtCore.QTimer.singleShot(0, lambda: self.updateTree(progressive=True))
+        else:
+            # a bundle another panel already scanned is reused
+            self.updateTree(paths=(), progressive=True)
+        self.startupTimes["populate"] = time.perf_counter() - populateStart
+        self.nodeTree.viewport().repaint()
+        self.startupTimes["firstPaint"] = time.perf_counter() - populateStart
+        if self.config["Startup_Timing"]:
+            reportStartup(self, self.startupTimes)
     
     def test(self):
         print("test")
@@ -231,18 +1310,26 @@ class Bookmark(QtWidgets.QWidget):
                 }
             """)
 
-        item = self.nodeTree.itemAt(position)
+        index = self.nodeTree.indexAt(position)
+        item = index.internalPointer() if index.isValid() else None
         if not item:
             action1 = menu.addAction("Rrefresh")
             menu.addSeparator()
             action_add = menu.addAction("Add Seleted Nodes")
             action_paste = menu.addAction("Add Node From Clipboard")
+            action_open = menu.addAction("Quick Open...")
+            action_sync = menu.addAction("Sync Selection")
+            action_sync.setCheckable(True)
+            action_sync.setChecked(self.selectionSync)
             
             menu.addSeparator()
             action2 = menu.addAction("Sort by Name")
             action3 = menu.addAction("Sort by Color")
             action4 = menu.addAction("Sort by Node Type")
-            
+            action_merge = None
+            if self.store:
+                menu.addSeparator()
+                action_merge = menu.addAction("Merge Bookmarks From Shot...")
             
             action = menu.exec_(self.nodeTree.viewport().mapToGlobal(position))
             if action == action1:
@@ -257,6 +1344,12 @@ class Bookmark(QtWidgets.QWidget):
                 self.addSeletcdNodes()
             if action == action_paste:
                 self.pasteNode()
+            if action == action_open:
+                self.quickOpen()
+            if action == action_sync:
+                self.setSelectionSync(action_sync.isChecked())
+            if action and action == action_merge:
+                self.mergeFromStore()
 
         else:
             actions = [
@@ -267,6 +1360,8 @@ class Bookmark(QtWidgets.QWidget):
                 ("Copy Path", lambda: self.copyPath(), True),
                 ("Copy As ObjMerge - Relative", lambda: self.copyAsObjMerge(True), root_type == "Sop"),
                 ("Copy As ObjMerge - Absolute", lambda: self.copyAsObjMerge(False), root_type == "Sop"),
+                ("Copy As Single ObjMerge - Relative", lambda: self.copyAsObjMerge(True, single=True), root_type == "Sop"),
+                ("Copy As Single ObjMerge - Absolute", lambda: self.copyAsObjMerge(False, single=True), root_type == "Sop"),
                 (None, None, True),  # Separator
                 ("Node Parameter", lambda: self.openParam(), True),
                 ("Node Network", lambda: self.openNetwork(item),True),
@@ -298,12 +1393,12 @@ class Bookmark(QtWidgets.QWidget):
                 name = bundle.name()
                 pattern = bundle.pattern()
                 if pattern:
-                    self.bundleComboBox.addItem(hou.qt.Icon("DATATYPES_bundle_smart"),name)
+                    self.bundleComboBox.addItem(cachedIcon("DATATYPES_bundle_smart"),name)
                 else:
-                    self.bundleComboBox.addItem(hou.qt.Icon("DATATYPES_bundle"),name)
+                    self.bundleComboBox.addItem(cachedIcon("DATATYPES_bundle"),name)
         else:
             hou.addNodeBundle("Bookmarks")
-            self.bundleComboBox.addItem(hou.qt.Icon("DATATYPES_bundle"),"Bookmarks")
+            self.bundleComboBox.addItem(cachedIcon("DATATYPES_bundle"),"Bookmarks")
         
         if currentText and self.bundleComboBox.findText(currentText) != -1:
             self.bundleComboBox.setCurrentText(currentText)
@@ -321,9 +1416,9 @@ class Bookmark(QtWidgets.QWidget):
                     self.nodeBundle.setFilter(filter_type)
                     pattern = self.nodeBundle.pattern()
                     if pattern:
-                        self.bundleComboBox.addItem(hou.qt.Icon("DATATYPES_bundle_smart"),name)
+                        self.bundleComboBox.addItem(cachedIcon("DATATYPES_bundle_smart"),name)
                     else:
-                        self.bundleComboBox.addItem(hou.qt.Icon("DATATYPES_bundle"),name)
+                        self.bundleComboBox.addItem(cachedIcon("DATATYPES_bundle"),name)
                     self.bundleComboBox.setCurrentText(name)
                 except:
                     hou.ui.displayMessage("Node bundle already exists")
@@ -336,12 +1431,14 @@ class Bookmark(QtWidgets.QWidget):
             try:
                 if name != newName:
                     self.nodeBundle.setName(newName)
+                    self.service.invalidate(name)
+                    self.treeName = newName
                     index = self.bundleComboBox.findText(name)
                     self.bundleComboBox.setItemText(index,newName)
                 if self.nodeBundle.pattern():
                     self.nodeBundle.setPattern(pattern)
                     self.nodeBundle.setFilter(filter_type)
-                self.updateTree()
+                self.updateTree(progressive=True)
                 
             except:
                     hou.ui.displayMessage("Node bundle already exists")
@@ -352,6 +1449,9 @@ class Bookmark(QtWidgets.QWidget):
         if confirmed:
             try:
                 hou.nodeBundle(name).destroy()
+                self.service.invalidate(name)
+                # the next bundle reuses the tree of the removed one
+                self.treeName = None
                 index = self.bundleComboBox.findText(name)
                 if index != -1:
                     self.bundleComboBox.removeItem(index)
@@ -361,219 +1461,521 @@ class Bookmark(QtWidgets.QWidget):
             except:
                 print("nothing removed")
 
-    def updateTree(self):
-        state = {}
-        root = self.nodeTree.invisibleRootItem()
-        for item in self.iterateItems(root):
-            state[self.getPath(item)] = item.isExpanded()
-
+    @profiled
+    def updateTree(self, paths=None, progressive=False):
+        # reconcile the tree with the bundle, paths limits the restyle of existing rows.
+        # progressive builds of large bundles stream in over several event loop ticks
+        self.cancelBuild()
+        if self.storeTimer.isActive():
+            self.storeTimer.stop()
+            self.saveSnapshot()
         self.nodeBundle = hou.nodeBundle(self.bundleComboBox.currentText())
         if not self.nodeBundle:
             return
-        nodes = self.nodeBundle.nodes()
-        self.nodeTree.clear()
-        for node in nodes:
-            if not node.parent().isEditable():
+        name = self.nodeBundle.name()
+        if paths is None:
+            self.service.invalidate(name)
+        cached = self.swapTree(name) if name != self.treeName else None
+        self.service.subscribe(self, name)
+        scan = self.service.scan(self.nodeBundle)
+        nodes = scan.nodes
+        self.bundleSize = len(nodes)
+        if cached is not None and scan is cached.scan:
+            # nothing changed the bundle while its tree was cached
+            self.nodeModel.restyle(cached.paths)
+            self.service.syncCallbacks()
+            self.syncSelectionNodes()
+            return
+        if cached is not None and paths is not None:
+            # rows restyled while the tree was cached still need their new records
+            paths = set(paths) | cached.paths
+        if scan.wanted is not None:
+            # another panel already walked this evaluation
+            self.finishTree(scan, scan.wanted, scan.watched, paths)
+            return
+        wanted = set()
+        watched = {}
+        walk = self.walkBundle(scan, nodes, wanted, watched)
+        if progressive and len(nodes) > self.config["Progressive_Threshold"]:
+            self.treeBuild = (scan, walk, wanted, watched, paths)
+            self.buildProgress.setRange(0, len(nodes))
+            self.buildProgress.setValue(0)
+            self.buildProgress.show()
+            self.buildTimer.start()
+            return
+        for added in walk:
+            pass
+        self.finishTree(scan, wanted, watched, paths)
+
+    def walkBundle(self, scan, nodes, wanted, watched):
+        for added in walkNodes(nodes, wanted, watched, bool(self.nodeBundle.pattern()), ROW_EVENTS, CHILD_EVENTS,
+                               (hou.ObjectWasDeleted,)):
+            if added is None:
+                # deleted while the walk ran, no callback told the scan yet
+                scan.stale = True
+                self.onBundleChanged()
+                added = []
+            yield added
+
+    @profiled
+    def buildStep(self):
+        scan, walk, wanted, watched, paths = self.treeBuild
+        deadline = time.perf_counter() + self.config["Build_Slice_Ms"] / 1000.0
+        added = []
+        count = 0
+        for new_paths in walk:
+            added.extend(new_paths)
+            count += 1
+            if time.perf_counter() > deadline:
+                break
+        else:
+            self.cancelBuild()
+            self.finishTree(scan, wanted, watched, paths)
+            return
+        self.nodeModel.extend(added)
+        self.buildProgress.setValue(self.buildProgress.value() + count)
+
+    def cancelBuild(self):
+        self.buildTimer.stop()
+        self.treeBuild = None
+        self.buildProgress.hide()
+
+    def finishTree(self, scan, wanted, watched, paths):
+        if scan.wanted is None:
+            # new and renamed nodes under the static part of a smart pattern change membership
+            roots = []
+            for root in scan.roots:
+                # a missing root is watched through its closest existing parent
+                node = hou.node(root)
+                while node is None:
+                    root = root.rsplit("/", 1)[0] or "/"
+                    node = hou.node(root)
+                watched[node.sessionId()] = (node, ROW_EVENTS + CHILD_EVENTS)
+                roots.append(node)
+            depth = patternDepth(scan.key[0]) if scan.key[0] else 0
+            if depth is None:
+                # relative patterns can match anywhere, they are evaluated again every time
+                scan.stale = True
+            else:
+                watchPattern(roots, depth, watched, (hou.nodeEventType.NameChanged,), CHILD_EVENTS)
+            scan.wanted = wanted
+            scan.watched = watched
+
+        self.treeScan = scan
+        self.nodeModel.reconcile(wanted, paths)
+        self.service.syncCallbacks()
+        self.syncSelectionNodes()
+        if self.searchVisible is not None:
+            self.searchItem()
+        if self.store:
+            self.storeTimer.start()
+
+    def newTreeModel(self):
+        model = NodeTreeModel(self, self.service.nodeCache)
+        model.rowsInserted.connect(self.onRowsInserted)
+        return model
+
+    def setTreeModel(self, model):
+        model.sortMode = self.nodeModel.sortMode
+        model.profiler = self.profiler
+        self.nodeModel = model
+        selection = self.nodeTree.selectionModel()
+        self.nodeTree.setModel(model)
+        self.nodeTree.selectionModel().selectionChanged.connect(self.onTreeSelectionChanged)
+        selection.deleteLater()
+
+    def treeState(self):
+        # expanded rows and the row at the top of the view
+        model = self.nodeModel
+        expanded = [path for path, item in model.items.items()
+                    if item.children and self.nodeTree.isExpanded(model.indexFromItem(item))]
+        top = self.nodeTree.indexAt(QtCore.QPoint(0, 0))
+        return expanded, top.internalPointer().path if top.isValid() else None
+
+    @profiled
+    def swapTree(self, name):
+        # park the shown tree in the cache and show the cached tree of name or an empty one,
+        # returns the cache entry or None when the tree has to be built
+        if self.treeName is None:
+            self.treeName = name
+            return None
+        expanded, top = self.treeState()
+        parked = CachedTree(self.nodeModel, self.treeScan, expanded, top, self.searchSource, self.searchPaths)
+        parked.paths = self.pendingPaths
+        self.eventTimer.stop()
+        self.pendingPaths = set()
+        self.pendingMembership = False
+        for dropped in self.treeCache.put(self.treeName, parked):
+            dropped.model.deleteLater()
+        cached = self.treeCache.pop(name)
+        self.service.cache(self, self.treeCache.entries)
+        self.treeName = name
+        self.treeScan = cached.scan if cached else None
+        self.setTreeModel(cached.model if cached else self.newTreeModel())
+
+        self.searchVisible = None
+        if cached:
+            self.searchSource = cached.searchSource
+            self.searchPaths = cached.searchPaths
+            # expanding right after setModel only records the rows, the view lays out once
+            model = self.nodeModel
+            for path in cached.expanded:
+                item = model.items.get(path)
+                if item is not None:
+                    self.nodeTree.expand(model.indexFromItem(item))
+            if cached.top in model.items:
+                self.nodeTree.scrollTo(model.indexFromItem(model.items[cached.top]), QtWidgets.QAbstractItemView.PositionAtTop)
+        if self.searchLine.text():
+            self.searchItem()
+        return cached
+
+    def clearTreeCache(self):
+        for dropped in self.treeCache.clear():
+            dropped.model.deleteLater()
+        self.service.cache(self, ())
+        self.treeName = None
+
+    def storeHip(self):
+        # the hip file the store keys the scene by, None while the scene is unsaved since every
+        # untitled session would share one untitled.hip entry
+        if self.store is None or hou.hipFile.isNewFile():
+            return None
+        return hou.hipFile.path()
+
+    @profiled
+    def paintSnapshot(self):
+        # fill the tree from the store, returns False when the bundle was never stored
+        hip = self.storeHip()
+        if hip is None or not self.nodeBundle:
+            return False
+        stored = self.store.loadBundle(hip, self.nodeBundle.name())
+        if stored is None:
+            return False
+        pattern, filter_name, members, records = stored
+        self.nodeModel.nodeCache.snapshot = {path: storedRecord(path, data) for path, data in records.items() if data}
+        self.bundleSize = len(members)
+        self.nodeModel.reconcile(set(records), paths=())
+        return True
+
+    @profiled
+    def saveSnapshot(self):
+        # write the bundle and the records of every painted row to the store
+        self.storeTimer.stop()
+        hip = self.storeHip()
+        if hip is None or not self.nodeBundle:
+            return
+        try:
+            name = self.nodeBundle.name()
+            pattern = self.nodeBundle.pattern()
+            filter_name = self.nodeBundle.filter().name()
+            members = [node.path() for node in self.service.scan(self.nodeBundle).nodes]
+        except hou.ObjectWasDeleted:
+            return
+        records = dict.fromkeys(path for path in self.nodeModel.childPaths if path)
+        for path, item in self.nodeModel.items.items():
+            if item.record is not None and item.record.sessionId is not None:
+                records[path] = storeRecord(item.record)
+        self.store.saveBundle(hip, name, pattern, filter_name, members, records)
+
+    @profiled
+    def mergeFromStore(self):
+        # add the bookmark sets stored for another hip file to this scene
+        hip = hou.hipFile.path()
+        # untitled.hip entries were written by unsaved sessions before they were skipped
+        hips = [source for source in self.store.hipFiles() if source != hip and os.path.basename(source) != "untitled.hip"]
+        if not hips:
+            hou.ui.displayMessage("No bookmarks stored for other hip files")
+            return
+        choice = hou.ui.selectFromList(hips, exclusive=True, title="Merge Bookmarks From Shot", column_header="Hip File")
+        if not choice:
+            return
+        source = hips[choice[0]]
+        added = 0
+        skipped = []
+        with self.batchEdit("Merge Bookmarks", membership=True):
+            for name, pattern, filter_name in self.store.bundles(source):
+                bundle = hou.nodeBundle(name)
+                if pattern:
+                    if bundle is None:
+                        bundle = hou.addNodeBundle(name)
+                        bundle.setPattern(pattern)
+                        bundle.setFilter(getattr(hou.nodeTypeFilter, filter_name, hou.nodeTypeFilter.NoFilter))
+                    continue
+                if bundle is None:
+                    bundle = hou.addNodeBundle(name)
+                elif bundle.pattern():
+                    continue
+                for path in self.store.loadBundle(source, name)[2]:
+                    node = hou.node(path)
+                    if node is None:
+                        skipped.append(path)
+                    elif not bundle.containsNode(node):
+                        bundle.addNode(node)
+                        added += 1
+                self.service.bundleChanged(name, self)
+        self.initBundle()
+        message = f"Merged {added} bookmarks from {source}"
+        if skipped:
+            message += f"\nSkipped {len(skipped)} paths missing in this scene"
+        hou.ui.displayMessage(message, details="\n".join(skipped))
+
+    def removeCallbacks(self):
+        self.eventTimer.stop()
+        self.service.unsubscribe(self)
+        self.setSelectionSync(False)
+
+    def setSelectionSync(self, on):
+        self.selectionSync = on
+        self.syncSelectionNodes()
+        if on:
+            self.pullSelection()
+        else:
+            self.pullTimer.stop()
+            self.pushTimer.stop()
+
+    def syncSelectionNodes(self):
+        # child selection callbacks on the networks holding rows, only while syncing
+        wanted = {}
+        if self.selectionSync:
+            paths = [path for path, children in self.nodeModel.childPaths.items() if path and children]
+            for node in hou.nodes(paths) if paths else ():
+                if node is not None:
+                    wanted[node.sessionId()] = node
+        for sid, node in list(self.selectionNodes.items()):
+            if sid in wanted:
                 continue
-            parts = node.path().strip("/").split("/")
-            root = self.nodeTree.invisibleRootItem()
-            parent = root
-            for i, part in enumerate(parts):
-                if part in [parent.child(i).text(0) for i in range(parent.childCount())]:
-                    
-                    for i in range(parent.childCount()):
-                        if parent.child(i).text(0) == part:
-                            parent = parent.child(i)
-                            break
-                else:
-                    
-                    current_path = "/" + "/".join(parts[:i + 1])
-                    hou_node = hou.node(current_path)
-
-                    child = SortableItem([part, ""])
-                    parent.addChild(child)
-                    parent = child
-                    if self.getPath(child) in state.keys():
-                        child.setExpanded(state[self.getPath(child)])
-                    else:
-                        child.setExpanded(True)
-                    
-                    if not hou_node.parent().isEditable():
-                        child.setForeground(0, QBrush(QColor(100, 100, 100)))
-                        continue
-                    # set color
-                    if hou_node.type().defaultColor() != hou_node.color():
-                        r, g, b = [int(c * 255) for c in hou_node.color().rgb()]
-                        average_color = sum([r, g, b]) // 3
-                        if average_color > 128: 
-                            child.setForeground(0, QBrush(QColor(0, 0, 0)))
-                        color = QColor(r, g, b)
-                        for col in range(4):
-                            child.setBackground(col, QBrush(color))
-                    
-                    # set icon
-                    item_icon = hou_node.type().icon()
-                    icon = QIcon(hou.qt.Icon(item_icon))
-                    child.setIcon(0, icon)
-                    child.setData(0, QtCore.Qt.UserRole, hou_node.type().name())
-
-
-                    # set node flags
-                    icon_off = hou.qt.Icon("SCENEGRAPH_active_off")
-                    icon_on = hou.qt.Icon("SCENEGRAPH_active_on")
-
-                    flags = ["isDisplayFlagSet", "isTemplateFlagSet", "isSelectableTemplateFlagSet"]
-                    flag = -1
-
-                    for i, flag_name in enumerate(flags):
-                        if hasattr(hou_node, flag_name):
-                            method = getattr(hou_node, flag_name)
-                            if callable(method):
-                                if method():
-                                    icon = icon_on
-                                    flag = 1
-                                else:
-                                    icon = icon_off
-                                    flag = 0
-                                child.setIcon(i+1, icon)
-                        else:
-                            flag = -1
-                    
-                        child.setData(i+1, QtCore.Qt.UserRole, flag)
+            try:
+                node.removeEventCallback((hou.nodeEventType.ChildSelectionChanged,), self.onSelectionEvent)
+            except (hou.ObjectWasDeleted, hou.OperationFailed):
+                pass
+            del self.selectionNodes[sid]
+        for sid, node in wanted.items():
+            if sid not in self.selectionNodes:
+                node.addEventCallback((hou.nodeEventType.ChildSelectionChanged,), self.onSelectionEvent)
+                self.selectionNodes[sid] = node
 
-        self.nodeTree.sortItems(0, self.nodeTree.header().sortIndicatorOrder())
+    def onSelectionEvent(self, event_type, node, **kwargs):
+        # a box selection fires once per node, the pull runs once per throttle window
+        if not self.selectionPushing and not self.pullTimer.isActive():
+            self.pullTimer.start()
 
-    def getPath(self, item):
-        path = []
-        child = item
-        while child:
-            path.append(child.text(0))
-            child = child.parent()
-        path = "/" + "/".join(reversed(path))
-        if hou.node(path):
-            return path
+    def onTreeSelectionChanged(self, selected, deselected):
+        if self.selectionSync and not self.selectionPulling and not self.pushTimer.isActive():
+            self.pushTimer.start()
+
+    @profiled
+    def pullSelection(self):
+        # select the rows of the nodes selected in houdini, rows are resolved through the path index
+        self.pullTimer.stop()
+        childPaths = self.nodeModel.childPaths
+        paths = [path for path in (node.path() for node in hou.selectedNodes()) if path in childPaths]
+        if set(paths) == set(item.path for item in self.selectedItems()):
+            return
+        self.selectionPulling = True
+        try:
+            self.nodeTree.selectionModel().clearSelection()
+            self.selectPaths(paths)
+        finally:
+            self.selectionPulling = False
+
+    @profiled
+    def pushSelection(self):
+        # select the nodes of the selected rows in houdini as one batch
+        self.pushTimer.stop()
+        paths = [item.path for item in self.selectedItems()]
+        self.selectionPushing = True
+        try:
+            hou.clearAllSelected()
+            for node in hou.nodes(paths) if paths else ():
+                if node is not None:
+                    node.setSelected(True, clear_all_selected=False)
+        finally:
+            self.selectionPushing = False
+
+    def onNodeEvent(self, event_type, node, **kwargs):
+        if event_type in (hou.nodeEventType.AppearanceChanged, hou.nodeEventType.FlagChanged):
+            self.pendingPaths.add(node.path())
+        else:
+            self.pendingMembership = True
+        if not self.batching:
+            self.eventTimer.start()
+
+    def onCachedNodeEvent(self, name, event_type, node):
+        # membership changes make the scan stale, the tree is diffed against the new one when shown
+        cached = self.treeCache.entries.get(name)
+        if cached is not None and event_type in (hou.nodeEventType.AppearanceChanged, hou.nodeEventType.FlagChanged):
+            cached.paths.add(node.path())
+
+    def onBundleChanged(self):
+        self.pendingMembership = True
+        if not self.batching:
+            self.eventTimer.start()
+
+    @profiled
+    def flushNodeEvents(self, progressive=True):
+        # scene edits rebuild large bundles in time slices, panel actions need their rows at once
+        self.eventTimer.stop()
+        paths = self.pendingPaths
+        self.pendingPaths = set()
+        if self.pendingMembership:
+            self.pendingMembership = False
+            self.updateTree(paths=paths, progressive=progressive)
         else:
+            self.nodeModel.restyle(paths)
+            if self.store:
+                self.storeTimer.start()
+
+    @contextmanager
+    def batchEdit(self, label, paths=(), membership=False):
+        # one undo step and one tree refresh for a whole panel action
+        self.nodeTree.setUpdatesEnabled(False)
+        self.batching = True
+        try:
+            with hou.undos.group(label):
+                yield
+        finally:
+            self.batching = False
+            self.pendingPaths.update(paths)
+            self.pendingMembership = self.pendingMembership or membership
+            if membership and self.nodeBundle:
+                self.service.bundleChanged(self.nodeBundle.name(), self)
+            self.flushNodeEvents(progressive=False)
+            self.nodeTree.setUpdatesEnabled(True)
+
+    def onRowsInserted(self, parent, first, last):
+        expand = self.bundleSize <= self.config["Auto_Expand_Limit"]
+        for row in range(first, last + 1):
+            index = self.nodeModel.index(row, 0, parent)
+            if self.searchVisible is not None:
+                self.nodeTree.setRowHidden(row, parent, index.internalPointer().path not in self.searchVisible)
+            if expand:
+                self.nodeTree.expand(index)
+
+    def getPath(self, item):
+        if item is None:
             return None
+        return item.path
     
     def getItem(self, path):
-        parts = path.strip("/").split("/")
-
-        def find_child(parent_item, name):
-            for i in range(parent_item.childCount()):
-                child = parent_item.child(i)
-                if child.text(0) == name:
-                    return child
+        if not path:
             return None
-        for i in range(self.nodeTree.topLevelItemCount()):
-            top = self.nodeTree.topLevelItem(i)
-            if top.text(0) == parts[0]:
-                current = top
-                for part in parts[1:]:
-                    current = find_child(current, part)
-                    if current is None:
-                        return None
-                return current
-        return None
+        return self.nodeModel.fetchPath("/" + path.strip("/"))
     
+    def selectedItems(self):
+        return [index.internalPointer() for index in self.nodeTree.selectionModel().selectedRows()]
+
     def selectItem(self, nodes):
-        for node in nodes:
-            path = node.path()
-            item = self.getItem(path)
-            item.setSelected(True)
+        self.selectPaths([node.path() for node in nodes])
+
+    def selectPaths(self, paths):
+        # rows are found through the path index, neighbouring rows are selected as one range
+        items = [item for item in (self.getItem(path) for path in paths) if item]
+        if not items:
+            return
+        rows = {}
+        for item in items:
+            rows.setdefault(item.parent, []).append(item.row)
+        selection = QtCore.QItemSelection()
+        for parent, parentRows in rows.items():
+            parentRows.sort()
+            start = end = parentRows[0]
+            for row in parentRows[1:] + [None]:
+                if row == end + 1:
+                    end = row
+                    continue
+                selection.select(self.nodeModel.indexFromItem(parent.children[start]), self.nodeModel.indexFromItem(parent.children[end]))
+                start = end = row
+        self.nodeTree.selectionModel().select(selection, QtCore.QItemSelectionModel.Select | QtCore.QItemSelectionModel.Rows)
+        self.nodeTree.scrollTo(self.nodeModel.indexFromItem(items[-1]))
     
+    @profiled
     def deleteNode(self):
-        items = self.nodeTree.selectedItems()
-        deletedNodes = []
-        if items:
-            for item in items:
-                path = self.getPath(item)
-                nodes = self.nodeBundle.nodes()
-                for node in nodes:
-                    deletedNodes.append(node)
-                    if node.path().startswith(path):
-                        self.nodeBundle.removeNode(node)
-        self.updateTree()
+        selected = set(self.getPath(item) for item in self.selectedItems())
+        removed = []
+        if selected:
+            # a bundled node goes when it or one of its parents is selected
+            for node in self.nodeBundle.nodes():
+                path = node.path()
+                while path:
+                    if path in selected:
+                        removed.append(node)
+                        break
+                    path = path.rsplit("/", 1)[0]
+        with self.batchEdit("Remove Bookmarks", membership=True):
+            for node in removed:
+                self.nodeBundle.removeNode(node)
 
-    def iterateItems(self, parent):
-            for i in range(parent.childCount()):
-                child = parent.child(i)
-                yield child
-                yield from self.iterateItems(child) 
+    def searchIndex(self):
+        # name and path index of the tree, rebuilt once per refresh
+        if self.searchSource is not self.nodeModel.childPaths:
+            self.searchSource = self.nodeModel.childPaths
+            self.searchPaths = SearchIndex(self.searchSource, lambda path: self.nodeModel.nodeCache.get(path).typeName)
+        return self.searchPaths
 
+    @profiled
     def searchItem(self):
-        search_text = self.searchLine.text().lower()
-        def filter_item(item):
-            # Check if this item matches
-            match = search_text in item.text(0).lower()
-            # Recursively check children
-            child_match = False
-            for i in range(item.childCount()):
-                child = item.child(i)
-                if filter_item(child):
-                    child_match = True
-            # Show item if it matches or any child matches
-            item.setHidden(not (match or child_match))
-            return match or child_match
-
-        root = self.nodeTree.invisibleRootItem()
-        for i in range(root.childCount()):
-            filter_item(root.child(i))
+        self.searchTimer.stop()
+        index = self.searchIndex()
+        text = self.searchLine.text()
+        visible = None
+        if text:
+            matches = index.search(text, self.searchModeComboBox.currentText(), self.searchTypeCheckBox.isChecked())
+            if matches is None:
+                return
+            visible = visiblePaths(matches)
+        else:
+            index.reset()
+
+        old = self.searchVisible
+        self.searchVisible = visible
+        if visible is not None:
+            # rows created here pick up their state in onRowsInserted
+            for path in sorted(visible):
+                self.nodeModel.fetchPath(path)
+
+        # only touch rows whose visibility flips
+        if old is None and visible is None:
+            return
+        if old is None or visible is None:
+            paths = list(self.nodeModel.items)
+        else:
+            paths = old.symmetric_difference(visible)
+        for path in paths:
+            item = self.nodeModel.items.get(path)
+            if item is None:
+                continue
+            hidden = visible is not None and path not in visible
+            if hidden != (old is not None and path not in old):
+                self.nodeTree.setRowHidden(item.row, self.nodeModel.indexFromItem(item.parent), hidden)
 
+    @profiled
     def toggleColumnState(self, item, column):
         if column == 0:
             return
 
-        current_state = item.data(column, QtCore.Qt.UserRole)
+        record = self.nodeModel.recordOf(item)
+        current_state = flagOf(record.flags, column)
         if current_state == -1:
             return
     
         new_state = 1 - current_state
-        node = hou.node(self.getPath(item))
-        if column == 1:
-            node.setDisplayFlag(new_state == 1)
-            if hasattr(node,"setRenderFlag"):
-                node.setRenderFlag(new_state == 1)
-        if column == 2:
-            node.setTemplateFlag(new_state == 1)
-        if column == 3:
-            node.setSelectableTemplateFlag(new_state == 1)
-
-        root = self.nodeTree.invisibleRootItem()
-        icon_off = hou.qt.Icon("SCENEGRAPH_active_off")
-        icon_on = hou.qt.Icon("SCENEGRAPH_active_on")
-        for item in self.iterateItems(root):
-            # Return the item path
-            path = self.getPath(item)
-            hou_node = hou.node(path)
-            if not hou_node.parent().isEditable():
-                continue
-
-            flags = ["isDisplayFlagSet", "isTemplateFlagSet", "isSelectableTemplateFlagSet"]
-            data = -1
-
-            for i, flag_name in enumerate(flags):
-                if hasattr(hou_node, flag_name):
-                    method = getattr(hou_node, flag_name)
-                    if callable(method):
-                        if method():
-                            icon = icon_on
-                            data = 1
-                        else:
-                            icon = icon_off
-                            data = 0
-                        item.setIcon(i+1, icon)
-                else:
-                    data = -1
-                item.setData(i+1, QtCore.Qt.UserRole, data)
+        applyFlag(hou.node(self.getPath(item)), column, new_state)
+        self.nodeModel.setFlag(item, column, new_state, flagExclusive(record, column, new_state))
             
+    @profiled
     def findNode(self, item, column):
         path = self.getPath(item)
         
         if not path or column != 0:
             return
+        self.findPath(path)
+
+    def findPath(self, path):
         # get houdini network editor
         network_editor = hou.ui.paneTabOfType(hou.paneTabType.NetworkEditor)
         current_node = hou.node(path)
+        if current_node is None:
+            return
 
         if len(path.split("/")) <=2:
             network_editor.setPwd(current_node)
@@ -583,14 +1985,15 @@ class Bookmark(QtWidgets.QWidget):
             network_editor.setCurrentNode(current_node)
             network_editor.frameSelection()
         
+    @profiled
     def addNode(self,nodes):
         if self.nodeBundle.pattern():
             hou.ui.displayMessage("This is a smart bundle.")
         elif nodes:
-            for node in nodes:
-                
-                self.nodeBundle.addNode(node)
-            self.updateTree()
+            nodes = list(OrderedDict.fromkeys(node for node in nodes if node))
+            with self.batchEdit("Add Bookmarks", membership=True):
+                for node in nodes:
+                    self.nodeBundle.addNode(node)
                         
             self.selectItem(nodes)
         else:
@@ -600,49 +2003,87 @@ class Bookmark(QtWidgets.QWidget):
         nodes = hou.selectedNodes()
         self.addNode(nodes)
     
+    @profiled
+    def ingestPaths(self, text):
+        # add every node path in a block of text, e.g. a render log, as one edit.
+        # paths are deduped and looked up in one pass, the ones that do not resolve are
+        # reported, words that are no absolute path are ignored
+        if self.nodeBundle.pattern():
+            hou.ui.displayMessage("This is a smart bundle.")
+            return
+        tokens = OrderedDict.fromkeys(token.strip("'\",;") for token in text.split())
+        paths = [token for token in tokens if token.startswith("/")]
+        if not paths:
+            hou.ui.displayMessage("No node paths found")
+            return
+        members = set(node.sessionId() for node in self.service.scan(self.nodeBundle).nodes)
+        nodes = []
+        added = []
+        missing = []
+        present = []
+        for path, node in zip(paths, hou.nodes(paths) if paths else ()):
+            if node is None:
+                missing.append(path)
+            elif node.sessionId() in members:
+                present.append(path)
+            else:
+                members.add(node.sessionId())
+                nodes.append(node)
+                added.append(node.path())
+
+        if nodes:
+            with self.batchEdit("Add Bookmarks", membership=True):
+                for node in nodes:
+                    self.nodeBundle.addNode(node)
+            self.selectPaths(added)
+        if missing:
+            hou.ui.displayMessage(
+                f"Added {len(added)} bookmarks, {len(present)} already bookmarked, "
+                f"skipped {len(missing)} paths missing in this scene",
+                details="\n".join(missing), severity=hou.severityType.Warning)
+
+    @profiled
     def pasteNode(self):
         path_str = hou.ui.getTextFromClipboard()
         if path_str:
-            paths = path_str.split(" ")
-            nodes = [hou.node(path) for path in paths]
-            self.addNode(nodes)
+            self.ingestPaths(path_str)
 
+    @profiled
     def dropEvent(self, event):
         mimeData:QtCore.QMimeData = event.mimeData()
         if mimeData.hasText():
-            paths = mimeData.text().split("\t")
-
-            nodes = [hou.node(path) for path in paths]
-            self.addNode(nodes)
+            self.ingestPaths(mimeData.text())
         event.acceptProposedAction()
 
+    @profiled
     def setSortMode(self, mode):
-        self.nodeTree.sort_mode = mode  
-        self.nodeTree.sortItems(0, self.nodeTree.header().sortIndicatorOrder())
-        self.updateTree()
+        self.nodeModel.sortMode = mode  
+        self.nodeTree.sortByColumn(0, self.nodeTree.header().sortIndicatorOrder())
 
+    @profiled
     def setColor(self, sitem):
-        current_color = sitem.backgroundColor(1)
+        brush = self.nodeModel.data(self.nodeModel.indexFromItem(sitem, 1), QtCore.Qt.BackgroundRole)
+        current_color = brush.color() if brush else QColor(0, 0, 0)
         hou_color = hou.qt.fromQColor(current_color)[0]
         color = hou.ui.selectColor(hou_color)
-        items = self.nodeTree.selectedItems()
-        if items and color:
-            for item in items:
-                node_path = self.getPath(item)
-                node = hou.node(node_path)
-                node.setColor(color)
-        self.updateTree()   
+        paths = set(self.getPath(item) for item in self.selectedItems())
+        if paths and color:
+            with self.batchEdit("Set Bookmark Color", paths):
+                for path in paths:
+                    hou.node(path).setColor(color)
     
+    @profiled
     def clearColor(self):
-        items = self.nodeTree.selectedItems()
-        for item in items:
-            node = hou.node(self.getPath(item))
-            color = node.type().defaultColor()
-            node.setColor(color)
-        self.updateTree()
+        items = self.selectedItems()
+        paths = set(self.getPath(item) for item in items)
+        with self.batchEdit("Clear Bookmark Color", paths):
+            for item in items:
+                record = self.nodeModel.recordOf(item)
+                if record.editable:
+                    hou.node(item.path).setColor(hou.Color(record.defaultColor))
 
     def copyNode(self):
-        items = self.nodeTree.selectedItems()
+        items = self.selectedItems()
         nodes = []
         for item in items:
             nodes.append(hou.node(self.getPath(item)))
@@ -652,7 +2093,7 @@ class Bookmark(QtWidgets.QWidget):
             hou.ui.displayMessage("Some nodes to copy to clipbard have different parents", buttons=('OK',),severity=hou.severityType.Warning)
     
     def copyPath(self):
-        items = self.nodeTree.selectedItems()
+        items = self.selectedItems()
         paths = []
         for item in items:
             path = self.getPath(item)
@@ -660,8 +2101,12 @@ class Bookmark(QtWidgets.QWidget):
         str_path = " ".join(paths)
         hou.ui.copyTextToClipboard(str_path)
     
+    def quickOpen(self):
+        dialog = QuickOpenDialog(self)
+        dialog.exec_()
+
     def openParam(self):
-        items = self.nodeTree.selectedItems()
+        items = self.selectedItems()
         for item in items:
             node = hou.node(self.getPath(item))
             hou.ui.showFloatingParameterEditor(node)
@@ -674,41 +2119,67 @@ class Bookmark(QtWidgets.QWidget):
             editorTab = networkEditor.paneTabs()[0]
             editorTab.setCurrentNode(node, pick_node = True)
 
-    def copyAsObjMerge(self,rel):
+    @profiled
+    def copyAsObjMerge(self, rel, single=False):
+        # the object_merge nodes are built in a scratch network instead of the current one, so the
+        # current network neither cooks nor records undo steps for them. single packs every path
+        # into the multiparm of one object_merge
         desktop = hou.ui.curDesktop()
         tab =  desktop.paneTabOfType(hou.paneTabType.NetworkEditor)
         root:hou.OpNode = tab.pwd()
-        items = self.nodeTree.selectedItems()
-        nodes = []
-        if items:
-            for i, item in enumerate(items):
-                path = self.getPath(item)
-                name = item.text(0)
-                if "OUT" in name:
-                    name = name.replace("OUT", "IN")
+        items = self.selectedItems()
+        if not items:
+            return
+        paths = []
+        for item in items:
+            path = self.getPath(item)
+            if rel:
+                # the pasted nodes sit one level below root
+                path = "../" + root.relativePathTo(hou.node(path))
+            paths.append(path)
+
+        with hou.undos.disabler(), self.service.mute():
+            scratch = hou.node("/obj").createNode("geo", "hz_bookmark_clipboard", run_init_scripts=False, force_valid_node_name=True)
+            try:
+                scratch.setDisplayFlag(False)
+                nodes = []
+                if single:
+                    objmerge = scratch.createNode("object_merge", node_name="IN_bookmarks", force_valid_node_name=True)
+                    objmerge.parm("numobj").set(len(paths))
+                    for i, path in enumerate(paths, 1):
+                        objmerge.parm("objpath%d" % i).set(path)
+                    nodes.append(objmerge)
                 else:
-                    name = "IN_" + name
-                objmerge = root.createNode("object_merge",node_name = name, force_valid_node_name=True)
-                objmerge.setColor(hou.node(path).color())
-                if rel:
-                    path = objmerge.relativePathTo(hou.node(path))
-                objmerge.setParms({"objpath1":path})
-                objmerge.setPosition(hou.Vector2(i*3,0))
-                nodes.append(objmerge)
-        nodes = tuple(nodes)
-        hou.copyNodesToClipboard(nodes)
-        root.deleteItems(nodes)
+                    for i, (item, path) in enumerate(zip(items, paths)):
+                        name = item.name
+                        if "OUT" in name:
+                            name = name.replace("OUT", "IN")
+                        else:
+                            name = "IN_" + name
+                        objmerge = scratch.createNode("object_merge",node_name = name, force_valid_node_name=True)
+                        record = self.nodeModel.recordOf(item)
+                        if record.color:
+                            objmerge.setColor(hou.Color(record.color))
+                        objmerge.setParms({"objpath1":path})
+                        objmerge.setPosition(hou.Vector2(i*3,0))
+                        nodes.append(objmerge)
+                hou.copyNodesToClipboard(tuple(nodes))
+            finally:
+                scratch.destroy()
 
     def configShortcut(self):
         shortcut = [
             ("Delete",self.deleteNode),
-            ("Refresh",self.updateTree),
+            ("Refresh",lambda: self.updateTree(progressive=True)),
             ("Copy_Node",self.copyNode),
             ("Copy_Path",self.copyPath),
             ("Paste_Node",self.pasteNode),
             ("Copy_As_ObjMerge_Relative",lambda: self.copyAsObjMerge(True)),
             ("Copy_As_OBjMerge_Absolute",lambda: self.copyAsObjMerge(False)),
+            ("Copy_As_Single_ObjMerge_Relative",lambda: self.copyAsObjMerge(True, single=True)),
+            ("Copy_As_Single_ObjMerge_Absolute",lambda: self.copyAsObjMerge(False, single=True)),
             ("Open_Parmeter",self.openParam),
+            ("Quick_Open",self.quickOpen),
             ("Close",self.closeTab)
         ]
         for name, action in shortcut:
@@ -718,9 +2189,32 @@ class Bookmark(QtWidgets.QWidget):
                 shortcut.activated.connect(action)
 
 
-widget = Bookmark()
+def reportStartup(widget, times):
+    # startup timing hook, replace it to collect the times elsewhere
+    print("hz_bookmark startup: " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in times.items()))
+
 def onCreateInterface():
-    return widget
+    return Bookmark()
+
+def onDestroyInterface(widget):
+    # the snapshot is saved while the panel still holds the scan of its bundle
+    if widget.store:
+        widget.saveSnapshot()
+        widget.store.close()
+        widget.store = None
+    widget.removeCallbacks()
+    if widget.profiler:
+        widget.profiler.stop()
+
+def onHipFileAfterLoad(widget):
+    widget.service.reset()
+    widget.clearTreeCache()
+    widget.bundleComboBox.blockSignals(True)
+    try:
+        widget.initBundle()
+    finally:
+        widget.bundleComboBox.blockSignals(False)
+    # rows of paths both files share must not keep the records of the old file
+    widget.updateTree()
 
-def onHipFileAfterLoad():
-    widget.initBundle()
\ No newline at end of file
+importTime = time.perf_counter() - importStart
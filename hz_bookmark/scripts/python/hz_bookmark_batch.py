@@ -0,0 +1,195 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from hz_bookmark_core import NodeCache, storeRecord
+
+# headless bookmark jobs over many hip files. Every job of the manifest loads one hip file
+# in its own hython process, up to --workers at once, and prints one json line when done.
+#   python hz_bookmark_batch.py shots.json --workers 8 --output results.jsonl
+#   python hz_bookmark_batch.py shots.json --fake      # workers run on hz_bookmark_fakehou
+#
+# The manifest is a json list of jobs, a json object {"defaults": {...}, "jobs": [...]} or
+# a .jsonl file with one job per line. A job is
+#   {"hip": "/shots/sh010/sh010.hip", "action": "apply", "bundle": "Lights",
+#    "paths": ["/obj/key_light"], "pattern": "/obj/*light*", "filter": "Obj", "save": true}
+# apply adds paths to a bundle or sets the pattern of a smart bundle and saves the hip file,
+# audit compares a bundle against paths without saving, export lists bundles and their
+# members, with display records when "records" is true
+
+# the worker writes its result after this prefix, hython may print to stdout as well
+RESULT_PREFIX = "HZ_BOOKMARK_RESULT "
+
+def loadManifest(path):
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, dict):
+        defaults = data.get("defaults", {})
+        return [dict(defaults, **job) for job in data["jobs"]]
+    return data
+
+# worker side, runs inside hython or with hz_bookmark_fakehou as hou
+
+def applyBundle(hou, job):
+    name = job.get("bundle", "Bookmarks")
+    bundle = hou.nodeBundle(name) or hou.addNodeBundle(name)
+    result = {"bundle": name}
+    if job.get("pattern"):
+        bundle.setPattern(job["pattern"])
+        bundle.setFilter(getattr(hou.nodeTypeFilter, job.get("filter", "NoFilter")))
+    else:
+        paths = job.get("paths", [])
+        members = set(node.sessionId() for node in bundle.nodes())
+        added = []
+        missing = []
+        for path, node in zip(paths, hou.nodes(paths) if paths else ()):
+            if node is None:
+                missing.append(path)
+            elif node.sessionId() not in members:
+                members.add(node.sessionId())
+                bundle.addNode(node)
+                added.append(path)
+        result.update(added=added, missing=missing)
+    result["members"] = len(bundle.nodes())
+    if job.get("save", True):
+        hou.hipFile.save()
+    return result
+
+def auditBundle(hou, job):
+    name = job.get("bundle", "Bookmarks")
+    bundle = hou.nodeBundle(name)
+    if bundle is None:
+        return {"bundle": name, "exists": False}
+    members = set(node.path() for node in bundle.nodes())
+    paths = job.get("paths", [])
+    missing = [path for path, node in zip(paths, hou.nodes(paths) if paths else ()) if node is None]
+    return {
+        "bundle": name,
+        "exists": True,
+        "members": len(members),
+        "missing": missing,
+        "notMembers": [path for path in paths if path not in members and path not in missing],
+        "extra": sorted(members.difference(paths)) if paths else [],
+    }
+
+def exportBundles(hou, job):
+    names = job.get("bundles") or [bundle.name() for bundle in hou.nodeBundles()]
+    cache = NodeCache(hou)
+    bundles = []
+    for name in names:
+        bundle = hou.nodeBundle(name)
+        if bundle is None:
+            bundles.append({"name": name, "exists": False})
+            continue
+        members = [node.path() for node in bundle.nodes()]
+        entry = {"name": name, "exists": True, "pattern": bundle.pattern(), "filter": bundle.filter().name(), "members": members}
+        if job.get("records"):
+            entry["records"] = {path: storeRecord(cache.get(path)) for path in members}
+        bundles.append(entry)
+    return {"bundles": bundles}
+
+ACTIONS = {
+    "apply": applyBundle,
+    "audit": auditBundle,
+    "export": exportBundles,
+}
+
+def runJob(hou, job):
+    action = ACTIONS.get(job.get("action", "export"))
+    if action is None:
+        raise ValueError(f"unknown action {job['action']!r}, expected one of {', '.join(ACTIONS)}")
+    hou.hipFile.load(job["hip"], suppress_save_prompt=True, ignore_load_warnings=True)
+    return action(hou, job)
+
+def worker(fake):
+    if fake:
+        import hz_bookmark_fakehou as hou
+    else:
+        import hou
+    job = json.loads(sys.stdin.read())
+    try:
+        result = dict(runJob(hou, job), ok=True)
+    except Exception as e:
+        result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    result.update(hip=job.get("hip"), action=job.get("action", "export"))
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+    sys.stdout.flush()
+    return 0
+
+# pool side
+
+def workerCommand(hython, fake):
+    script = os.path.abspath(__file__)
+    if fake:
+        return [sys.executable, script, "--worker", "--fake"]
+    return [hython, script, "--worker"]
+
+def runWorker(command, job, timeout, retries):
+    # a job runs again when its worker crashes or times out, errors the job reports are final
+    error = None
+    for attempt in range(1, retries + 2):
+        start = time.perf_counter()
+        try:
+            process = subprocess.run(command, input=json.dumps(job), capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            error = f"timed out after {timeout}s"
+            continue
+        for line in reversed(process.stdout.splitlines()):
+            if line.startswith(RESULT_PREFIX):
+                result = json.loads(line[len(RESULT_PREFIX):])
+                result.update(attempts=attempt, seconds=round(time.perf_counter() - start, 3))
+                return result
+        lines = process.stderr.strip().splitlines()
+        error = lines[-1] if lines else f"worker exited with {process.returncode}"
+    return {"ok": False, "hip": job.get("hip"), "action": job.get("action", "export"), "error": error, "attempts": retries + 1}
+
+def run(jobs, command, workers, timeout, retries, out):
+    # results are written as soon as their job is done, job is the index in the manifest
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(runWorker, command, job, timeout, retries): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            result = dict(future.result(), job=futures[future])
+            failed += not result["ok"]
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply, audit or export bookmark bundles over many hip files")
+    parser.add_argument("manifest", nargs="?", help="json or jsonl file of jobs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hython processes running at once")
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds a job may take before its worker is killed")
+    parser.add_argument("--retries", type=int, default=1, help="runs of a job after its worker crashed or timed out")
+    parser.add_argument("--hython", default="hython", help="hython executable of the workers")
+    parser.add_argument("--fake", action="store_true", help="run the workers with this python and hz_bookmark_fakehou")
+    parser.add_argument("--output", help="write the json lines to this file instead of stdout")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return worker(args.fake)
+    if not args.manifest:
+        parser.error("a manifest is required")
+
+    jobs = loadManifest(args.manifest)
+    command = workerCommand(args.hython, args.fake)
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        failed = run(jobs, command, max(args.workers, 1), args.timeout, args.retries, out)
+    finally:
+        if args.output:
+            out.close()
+    if failed:
+        print(f"{failed} of {len(jobs)} jobs failed", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import sys
+import json
+import time
+import argparse
+
+import hz_bookmark_fakehou as fakehou
+from hz_bookmark_core import (NodeCache, walkNodes, childPathsOf, sortKey, SearchIndex, NodeIndex, visiblePaths,
+                              FlagState, flagOf, withFlag, flagExclusive, applyFlag)
+
+# benchmark of the bookmark core on synthetic fakehou scenes, without Houdini or Qt.
+#   python hz_bookmark_bench.py --sizes 1000 10000 100000 --check
+# exits with 1 when an operation is slower than its threshold
+
+# milliseconds an operation may take per 1000 bundled nodes, toggle per 1000 flag flips
+# and palette for the slowest quick open query, whatever the scene size
+THRESHOLDS = {
+    "refresh": 120.0,
+    "sort": 60.0,
+    "search": 60.0,
+    "toggle": 150.0,
+    "index": 80.0,
+    "palette": 50.0,
+}
+
+# (depth, fanout) of the containers the bundled nodes are spread over
+SHAPES = [(1, 100), (2, 30), (4, 6)]
+
+SEARCH_QUERIES = [
+    ("Contains", "n"), ("Contains", "no"), ("Contains", "node"), ("Contains", "node1"), ("Contains", "node12"),
+    ("Fuzzy", "n1"), ("Fuzzy", "n12"),
+    ("Glob", "node*5"),
+    ("Regex", r"node\d+7$"),
+    ("Contains", "/geo1/"),
+]
+
+PALETTE_QUERIES = ["n", "node1", "nd12", "node12345", "box", "attrib", "geo1/node3", "zzz"]
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000.0, result
+
+def benchRefresh(bundle, scene):
+    # a full rebuild, walking the bundle and reading the record of every row
+    cache = NodeCache(scene)
+    wanted = set()
+    watched = {}
+    for added in walkNodes(bundle.nodes(), wanted, watched, False):
+        pass
+    childPaths = childPathsOf(wanted)
+    for path in wanted:
+        cache.get(path)
+    return cache, childPaths
+
+def benchSort(cache, childPaths):
+    for mode in ("Name", "Color", "Node Type"):
+        for column in (0, 1) if mode == "Node Type" else (0,):
+            for children in childPaths.values():
+                sorted(children, key=lambda path: sortKey(mode, column, path.rsplit("/", 1)[1].lower(),
+                                                          None if mode == "Name" else cache.get(path)))
+
+def benchSearch(cache, childPaths):
+    index = SearchIndex(childPaths, lambda path: cache.get(path).typeName)
+    for mode, query in SEARCH_QUERIES:
+        visiblePaths(index.search(query, mode, False))
+    visiblePaths(index.search("box", "Contains", True))
+
+def toggleRows(cache, childPaths):
+    # the record of every row and their flag state, like a fully painted panel
+    rows = {}
+    flagState = FlagState()
+    for path in childPaths:
+        if path:
+            rows[path] = cache.get(path)
+            flagState.update(rows[path])
+    return rows, flagState
+
+def benchToggle(cache, childPaths, rows, flagState, scene, count):
+    # flip the display flag of count leaf rows, updating the records of the sibling rows like the panel does
+    leaves = [path for path, children in childPaths.items() if path and not children][:count]
+    for path in leaves:
+        record = rows[path]
+        state = 1 - flagOf(record.flags, 1)
+        applyFlag(scene.node(path), 1, state)
+        changed = [path]
+        if flagExclusive(record, 1, state):
+            changed += flagState.siblingsSet(path, 1)
+        for row in changed:
+            rows[row] = cache.put(withFlag(rows[row], 1, state if row == path else 0))
+            flagState.update(rows[row])
+
+def benchIndex(scene):
+    # the quick open index over every node of the scene
+    index = NodeIndex()
+    for node in scene.allNodes(scene.root()):
+        index.add(node.path(), node.type().name(), node.sessionId())
+    return index
+
+def benchPalette(index):
+    return max(timed(lambda: index.search(query))[0] for query in PALETTE_QUERIES)
+
+def run(sizes, shapes, toggles=1000):
+    results = []
+    for count in sizes:
+        for depth, fanout in shapes:
+            bundle = fakehou.buildScene(count, depth, fanout)
+            result = {"nodes": count, "depth": depth, "fanout": fanout}
+            result["refresh"], (cache, childPaths) = timed(lambda: benchRefresh(bundle, fakehou))
+            result["sort"], _ = timed(lambda: benchSort(cache, childPaths))
+            result["search"], _ = timed(lambda: benchSearch(cache, childPaths))
+            result["toggles"] = min(toggles, count)
+            rows, flagState = toggleRows(cache, childPaths)
+            result["toggle"], _ = timed(lambda: benchToggle(cache, childPaths, rows, flagState, fakehou, result["toggles"]))
+            result["index"], index = timed(lambda: benchIndex(fakehou))
+            result["palette"] = benchPalette(index)
+            result["rows"] = len(childPaths) - 1
+            results.append(result)
+    return results
+
+def regressions(results):
+    failed = []
+    for result in results:
+        for name, limit in THRESHOLDS.items():
+            if name == "palette":
+                budget = limit
+            else:
+                budget = limit * max(result["toggles" if name == "toggle" else "nodes"], 1000) / 1000.0
+            if result[name] > budget:
+                failed.append((result, name, budget))
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the bookmark core on synthetic scenes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--shapes", nargs="+", default=["%dx%d" % shape for shape in SHAPES], help="depthxfanout, e.g. 2x30")
+    parser.add_argument("--check", action="store_true", help="exit with 1 when a threshold is exceeded")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    shapes = [tuple(int(n) for n in shape.split("x")) for shape in args.shapes]
+    results = run(args.sizes, shapes)
+    print("%8s %6s %6s %8s %10s %10s %10s %10s %10s %10s" % (
+        "nodes", "depth", "fanout", "rows", "refresh", "sort", "search", "toggle", "index", "palette"))
+    for result in results:
+        print("%8d %6d %6d %8d %8.1fms %8.1fms %8.1fms %8.1fms %8.1fms %8.1fms" % (
+            result["nodes"], result["depth"], result["fanout"], result["rows"],
+            result["refresh"], result["sort"], result["search"], result["toggle"], result["index"], result["palette"]))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = regressions(results)
+    for result, name, budget in failed:
+        print("REGRESSION %s on %d nodes (%dx%d): %.1fms > %.1fms" % (
+            name, result["nodes"], result["depth"], result["fanout"], result[name], budget))
+    if args.check and failed:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,486 @@
+import re
+import time
+import heapq
+import bisect
+import fnmatch
+import colorsys
+from collections import namedtuple
+
+# scene independent part of the Bookmark panel. A scene is any object with the node()
+# call of the hou module whose nodes follow the hou node api, hou itself or hz_bookmark_fakehou
+
+FLAG_GETTERS = ("isDisplayFlagSet", "isTemplateFlagSet", "isSelectableTemplateFlagSet")
+
+# the flags of a record are one int, bit column - 1 is set when the node has the flag of
+# flag column 1 to 3 and bit column + 2 when that flag is on
+def flagBits(states):
+    # states per flag column, -1 unsupported, 0 off, 1 on
+    bits = 0
+    for column, state in enumerate(states, 1):
+        if state != -1:
+            bits |= 1 << (column - 1)
+        if state == 1:
+            bits |= 1 << (column + 2)
+    return bits
+
+def flagOf(flags, column):
+    # -1 when the node has no such flag, else 0 or 1
+    if not flags >> (column - 1) & 1:
+        return -1
+    return flags >> (column + 2) & 1
+
+# what the panel shows of a node, rgb is None while the node has its default color
+# and hsv is its precomputed color sort key
+NodeRecord = namedtuple("NodeRecord", ["sessionId", "path", "typeName", "icon", "category", "editable", "color", "defaultColor", "rgb", "hsv", "flags"])
+
+def storeRecord(record):
+    # the json friendly part of a record, sessionIds do not survive the session
+    data = record._asdict()
+    del data["sessionId"], data["path"]
+    return data
+
+def storedRecord(path, data):
+    data = dict(data, sessionId=None, path=path)
+    for field in ("color", "defaultColor", "rgb", "hsv"):
+        if data[field] is not None:
+            data[field] = tuple(data[field])
+    # stores written before flags were packed hold one state per flag column
+    if isinstance(data["flags"], list):
+        data["flags"] = flagBits(data["flags"])
+    return NodeRecord(**data)
+
+class NodeCache(object):
+    # snapshot of node metadata keyed by sessionId, dropped on node events or an explicit refresh
+    def __init__(self, scene):
+        self.scene = scene
+        self.records = {}
+        self.sessionIds = {}
+        # stored records painted before the scene is read, path -> record
+        self.snapshot = {}
+
+    def get(self, path):
+        record = self.records.get(self.sessionIds.get(path))
+        if record is None or record.path != path:
+            record = self.snapshot.get(path)
+            if record is None:
+                record = self.put(self.nodeRecord(self.scene.node(path), path))
+        return record
+
+    def put(self, record):
+        if record.sessionId is not None:
+            self.records[record.sessionId] = record
+            self.sessionIds[record.path] = record.sessionId
+        return record
+
+    def invalidate(self, path):
+        self.records.pop(self.sessionIds.pop(path, None), None)
+
+    def invalidateNode(self, node):
+        self.records.pop(node.sessionId(), None)
+
+    def clear(self):
+        self.records = {}
+        self.sessionIds = {}
+        self.snapshot = {}
+
+    def nodeRecord(self, hou_node, path):
+        if hou_node is None:
+            return NodeRecord(None, path, None, None, None, False, None, None, None, (-1, 0, 0), 0)
+        if not hou_node.parent().isEditable():
+            return NodeRecord(hou_node.sessionId(), path, None, None, None, False, None, None, None, (-1, 0, 0), 0)
+        node_type = hou_node.type()
+        color = hou_node.color().rgb()
+        default_color = node_type.defaultColor().rgb()
+        rgb = None
+        hsv = (-1, 0, 0)
+        if color != default_color:
+            rgb = tuple(int(c * 255) for c in color)
+            h, s, v = colorsys.rgb_to_hsv(*[c / 255.0 for c in rgb])
+            hsv = (int(h * 360) if s else -1, int(s * 255), int(v * 255))
+
+        flags = 0
+        for column, flag_name in enumerate(FLAG_GETTERS, 1):
+            method = getattr(hou_node, flag_name, None)
+            if callable(method):
+                flags |= 1 << (column - 1)
+                if method():
+                    flags |= 1 << (column + 2)
+        return NodeRecord(hou_node.sessionId(), path, node_type.name(), node_type.icon(), node_type.category().name(),
+                          True, color, default_color, rgb, hsv, flags)
+
+# tree
+
+def walkNodes(nodes, wanted, watched, smart, rowEvents=(), childEvents=(), deleted=()):
+    # add each node and its parents to wanted and watched, yields the paths added per node.
+    # smart bundles also watch the parents of their nodes for membership changes. Nodes deleted
+    # while the walk runs yield None, deleted are the exceptions the scene raises for them
+    for node in nodes:
+        added = []
+        try:
+            parent = node.parent()
+        except deleted:
+            yield None
+            continue
+        if not parent.isEditable():
+            yield added
+            continue
+        if smart:
+            watched[parent.sessionId()] = (parent, rowEvents + childEvents)
+        path = node.path()
+        while path not in wanted and path != "/":
+            wanted.add(path)
+            added.append(path)
+            watched.setdefault(node.sessionId(), (node, rowEvents))
+            node = node.parent()
+            path = node.path()
+        yield added
+
+def watchPattern(roots, depth, watched, nameEvents=(), childEvents=()):
+    # watch whatever can change the membership of a smart pattern: renames of every node down to
+    # depth below the roots and the new or deleted children of every network above that depth
+    stack = list(roots)
+    seen = set()
+    while stack:
+        node = stack.pop()
+        sid = node.sessionId()
+        if sid in seen:
+            continue
+        seen.add(sid)
+        path = node.path()
+        events = nameEvents
+        if (0 if path == "/" else path.count("/")) < depth:
+            events = events + childEvents
+            stack.extend(node.children())
+        old = watched.get(sid, (node, ()))[1]
+        watched[sid] = (node, old + tuple(event for event in events if event not in old))
+
+def childPathsOf(wanted):
+    # parent path -> set of child paths, "" is the root
+    childPaths = {"": set()}
+    for path in wanted:
+        childPaths.setdefault(path, set())
+        childPaths.setdefault(path.rsplit("/", 1)[0], set()).add(path)
+    return childPaths
+
+def sortKey(mode, column, nameKey, record):
+    # name sorting never needs the record, record may be None then
+    if mode == "Color":
+        return record.hsv
+    elif mode == "Node Type":
+        if column == 0 or not record.editable:
+            return str(record.typeName)
+        return str(flagOf(record.flags, column))
+    else:
+        return nameKey if column == 0 else ""
+
+def patternRoots(pattern):
+    # the static part of each pattern, new nodes can only match below it. Exclusions never add matches
+    roots = []
+    for token in pattern.split():
+        if token.startswith("^"):
+            continue
+        parts = []
+        for part in token.strip("/").split("/"):
+            if any(c in part for c in "*?[^"):
+                break
+            parts.append(part)
+        roots.append("/" + "/".join(parts))
+    return roots
+
+def patternDepth(pattern):
+    # deepest path level the pattern can match, None when a token is not an absolute path.
+    # exclusions never add matches
+    depth = 0
+    for token in pattern.split():
+        if token.startswith("^"):
+            continue
+        if not token.startswith("/"):
+            return None
+        depth = max(depth, token.rstrip("/").count("/"))
+    return depth
+
+# search
+
+def searchMatcher(mode, query):
+    if mode == "Glob":
+        return lambda text: fnmatch.fnmatchcase(text, query)
+    if mode == "Regex":
+        try:
+            pattern = re.compile(query, re.IGNORECASE)
+        except re.error:
+            return None
+        return lambda text: pattern.search(text) is not None
+    if mode == "Fuzzy":
+        pattern = re.compile(".*?".join(re.escape(c) for c in query))
+        return lambda text: pattern.search(text) is not None
+    return lambda text: query in text
+
+class SearchIndex(object):
+    # lowercase name and path of every path in a tree, typeName looks up the type of a path
+    def __init__(self, childPaths, typeName):
+        self.entries = {}
+        for path in childPaths:
+            if path:
+                self.entries[path] = (path.rsplit("/", 1)[1].lower(), path.lower())
+        self.typeName = typeName
+        self.types = {}
+        self.query = None
+        self.matches = None
+
+    def searchTypeName(self, path):
+        if path not in self.types:
+            self.types[path] = str(self.typeName(path)).lower()
+        return self.types[path]
+
+    def reset(self):
+        self.query = None
+        self.matches = None
+
+    def search(self, text, mode, matchType):
+        # matching paths, None when the query is not a valid pattern
+        query = text if mode == "Regex" else text.lower()
+        match = searchMatcher(mode, query)
+        if match is None:
+            return None
+        field = 1 if "/" in query else 0
+
+        # a longer contains or fuzzy query can only match a subset of the previous matches
+        candidates = self.entries
+        if self.query and mode in ("Contains", "Fuzzy"):
+            previous, previousMode, previousType = self.query
+            if (previousMode, previousType) == (mode, matchType) and query.startswith(previous) and ("/" in previous) == bool(field):
+                candidates = self.matches
+
+        matches = set()
+        for path in candidates:
+            if match(self.entries[path][field]) or (matchType and match(self.searchTypeName(path))):
+                matches.add(path)
+        self.query = (query, mode, matchType)
+        self.matches = matches
+        return matches
+
+def visiblePaths(matches):
+    # matching paths and their parents
+    visible = set()
+    for path in matches:
+        while path and path not in visible:
+            visible.add(path)
+            path = path.rsplit("/", 1)[0]
+    return visible
+
+# quick open
+
+def nameGrams(name):
+    # every character and trigram of a lowercase name
+    grams = set(name)
+    grams.update(name[i:i + 3] for i in range(len(name) - 2))
+    return grams
+
+class NodeIndex(object):
+    # inverted index of node names for the quick open palette. Unique lowercase names are
+    # looked up through their characters and trigrams, and kept sorted per name length so
+    # the shortest matches are found without ranking every candidate
+    def __init__(self):
+        self.names = {}
+        self.types = {}
+        self.sessionIds = {}
+        # sessionId -> path, finds the old path of a renamed node
+        self.paths = {}
+        # name -> paths, gram -> names, type -> paths
+        self.byName = {}
+        self.grams = {}
+        self.byType = {}
+        # name length -> names as a set and as a sorted list
+        self.lengths = {}
+        self.sortedNames = {}
+        # parent path -> child paths, renames and removals move whole subtrees
+        self.children = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, path):
+        return path in self.names
+
+    def add(self, path, typeName, sessionId=None):
+        if path in self.names:
+            self.discard(path)
+        name = path.rsplit("/", 1)[1].lower()
+        typeName = str(typeName).lower()
+        self.names[path] = name
+        self.types[path] = typeName
+        if name not in self.byName:
+            self.byName[name] = set()
+            for gram in nameGrams(name):
+                self.grams.setdefault(gram, set()).add(name)
+            self.lengths.setdefault(len(name), set()).add(name)
+            bisect.insort(self.sortedNames.setdefault(len(name), []), name)
+        self.byName[name].add(path)
+        self.byType.setdefault(typeName, set()).add(path)
+        self.children.setdefault(path.rsplit("/", 1)[0], set()).add(path)
+        if sessionId is not None:
+            self.sessionIds[path] = sessionId
+            self.paths[sessionId] = path
+
+    def discard(self, path):
+        # forget a single path, its children stay
+        name = self.names.pop(path)
+        paths = self.byName[name]
+        paths.discard(path)
+        if not paths:
+            del self.byName[name]
+            for gram in nameGrams(name):
+                self.grams[gram].discard(name)
+            self.lengths[len(name)].discard(name)
+            names = self.sortedNames[len(name)]
+            del names[bisect.bisect_left(names, name)]
+        self.byType[self.types.pop(path)].discard(path)
+        self.children.get(path.rsplit("/", 1)[0], set()).discard(path)
+        sessionId = self.sessionIds.pop(path, None)
+        if self.paths.get(sessionId) == path:
+            del self.paths[sessionId]
+
+    def subtree(self, path):
+        paths = [path] if path in self.names else []
+        stack = [path]
+        while stack:
+            children = self.children.get(stack.pop(), ())
+            paths.extend(children)
+            stack.extend(children)
+        return paths
+
+    def remove(self, path):
+        # a path and everything below it
+        for sub in self.subtree(path):
+            if sub in self.names:
+                self.discard(sub)
+            self.children.pop(sub, None)
+
+    def rename(self, oldPath, newPath):
+        moved = [(sub, self.types[sub], self.sessionIds.get(sub)) for sub in self.subtree(oldPath)]
+        self.remove(oldPath)
+        for sub, typeName, sessionId in moved:
+            self.add(newPath + sub[len(oldPath):], typeName, sessionId)
+
+    def pathOf(self, sessionId):
+        return self.paths.get(sessionId)
+
+    def candidates(self, grams):
+        # names having every gram, smallest sets are intersected first
+        sets = sorted((self.grams.get(gram, ()) for gram in grams), key=len)
+        if not sets or not sets[0]:
+            return set()
+        found = set(sets[0])
+        for names in sets[1:]:
+            found &= names
+            if not found:
+                break
+        return found
+
+    def ranked(self, query, limit):
+        # paths in rank order: exact name, name prefix, name substring, type, fuzzy name.
+        # Shorter names rank first within each
+        for path in sorted(self.byName.get(query, ())):
+            yield path
+        lengths = sorted(length for length in self.lengths if length > len(query))
+        for length in lengths:
+            names = self.sortedNames[length]
+            for i in range(bisect.bisect_left(names, query), len(names)):
+                if not names[i].startswith(query):
+                    break
+                yield from sorted(self.byName[names[i]])
+
+        grams = [query[i:i + 3] for i in range(len(query) - 2)] if len(query) >= 3 else set(query)
+        found = set(name for name in self.candidates(grams) if query in name)
+        for length in lengths:
+            for name in sorted(found & self.lengths[length]):
+                if not name.startswith(query):
+                    yield from sorted(self.byName[name])
+
+        for typeName in sorted(self.byType):
+            if query in typeName:
+                yield from heapq.nsmallest(limit, self.byType[typeName], key=lambda path: (len(self.names[path]), path))
+
+        pattern = re.compile(".*?".join(re.escape(c) for c in query))
+        fuzzy = self.candidates(set(query)).difference(found)
+        for length in lengths:
+            for name in sorted(fuzzy & self.lengths[length]):
+                if pattern.search(name):
+                    yield from sorted(self.byName[name])
+
+    def search(self, text, limit=50, timeLimit=None):
+        # best matching paths first. Text before the last / has to match the parent path,
+        # parents containing it rank before parents only matching it fuzzily.
+        # With a time limit in seconds the matches found so far are returned
+        query = text.strip().lower().rstrip("/")
+        parentQuery, _, query = query.rpartition("/")
+        if not query:
+            return []
+        parentPattern = re.compile(".*?".join(re.escape(c) for c in parentQuery)) if parentQuery else None
+        deadline = time.perf_counter() + timeLimit if timeLimit else None
+        results = []
+        fuzzy = []
+        seen = set()
+        for count, path in enumerate(self.ranked(query, limit)):
+            if path in seen:
+                continue
+            seen.add(path)
+            if parentPattern is None:
+                results.append(path)
+            else:
+                parent_path = path.rsplit("/", 1)[0].lower()
+                if parentQuery in parent_path:
+                    results.append(path)
+                elif len(fuzzy) < limit and parentPattern.search(parent_path):
+                    fuzzy.append(path)
+            if len(results) >= limit:
+                break
+            if deadline and not count % 256 and time.perf_counter() > deadline:
+                break
+        return (results + fuzzy)[:limit]
+
+# flags
+
+class FlagState(object):
+    # rows with a flag set, per parent path and flag column, so an exclusive flag is
+    # cleared on its siblings without scanning every sibling row
+    def __init__(self):
+        self.setPaths = {}
+
+    def update(self, record):
+        parent_path = record.path.rsplit("/", 1)[0]
+        for column in (1, 2, 3):
+            key = (parent_path, column)
+            if record.flags >> (column + 2) & 1:
+                self.setPaths.setdefault(key, set()).add(record.path)
+            elif key in self.setPaths:
+                self.setPaths[key].discard(record.path)
+
+    def remove(self, path):
+        parent_path = path.rsplit("/", 1)[0]
+        for column in (1, 2, 3):
+            self.setPaths.get((parent_path, column), set()).discard(path)
+
+    def siblingsSet(self, path, column):
+        return [sibling for sibling in self.setPaths.get((path.rsplit("/", 1)[0], column), ()) if sibling != path]
+
+    def clear(self):
+        self.setPaths = {}
+
+def withFlag(record, column, state):
+    on = 1 << (column + 2)
+    return record._replace(flags=record.flags | on if state == 1 else record.flags & ~on)
+
+def flagExclusive(record, column, state):
+    # outside of object networks the display flag is exclusive among siblings
+    return column == 1 and state == 1 and record.category != "Object"
+
+def applyFlag(node, column, state):
+    if column == 1:
+        node.setDisplayFlag(state == 1)
+        if hasattr(node, "setRenderFlag"):
+            node.setRenderFlag(state == 1)
+    if column == 2:
+        node.setTemplateFlag(state == 1)
+    if column == 3:
+        node.setSelectableTemplateFlag(state == 1)
@@ -0,0 +1,399 @@
+import os
+import re
+import enum
+import fnmatch
+import itertools
+
+# in memory stand-in for the part of the hou module the bookmark core uses, so the core
+# can be driven and measured outside of Houdini. It is not a Houdini emulator, nodes only
+# hold a name, a type, a color, flags and event callbacks
+
+class ObjectWasDeleted(Exception):
+    pass
+
+class OperationFailed(Exception):
+    pass
+
+class nodeTypeFilter(enum.Enum):
+    NoFilter = 0
+    Obj = 1
+    Sop = 2
+
+    def name(self):
+        return self._name_
+
+class nodeEventType(enum.Enum):
+    NameChanged = 0
+    AppearanceChanged = 1
+    FlagChanged = 2
+    BeingDeleted = 3
+    ChildCreated = 4
+    ChildDeleted = 5
+
+class Color(object):
+    def __init__(self, rgb=(0.8, 0.8, 0.8)):
+        self._rgb = tuple(rgb)
+
+    def rgb(self):
+        return self._rgb
+
+    def __eq__(self, other):
+        return isinstance(other, Color) and other._rgb == self._rgb
+
+    def __hash__(self):
+        return hash(self._rgb)
+
+class NodeTypeCategory(object):
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+class NodeType(object):
+    def __init__(self, name, category, color=(0.8, 0.8, 0.8)):
+        self._name = name
+        self._category = NodeTypeCategory(category)
+        self._color = Color(color)
+
+    def name(self):
+        return self._name
+
+    def icon(self):
+        return self._category.name().upper() + "_" + self._name
+
+    def category(self):
+        return self._category
+
+    def defaultColor(self):
+        return self._color
+
+# node types by category and name, created on first use
+nodeTypes = {}
+
+def nodeType(category, name):
+    key = (category, name)
+    if key not in nodeTypes:
+        nodeTypes[key] = NodeType(name, category)
+    return nodeTypes[key]
+
+sessionIds = itertools.count(1)
+nodesById = {}
+
+class Node(object):
+    def __init__(self, parent, name, node_type):
+        self._parent = parent
+        self._name = name
+        self._type = node_type
+        self._color = node_type.defaultColor()
+        self._children = {}
+        self._callbacks = []
+        self._sessionId = next(sessionIds)
+        self._deleted = False
+        nodesById[self._sessionId] = self
+
+    def _check(self):
+        if self._deleted:
+            raise ObjectWasDeleted()
+
+    def _fire(self, event_type, **kwargs):
+        for types, callback in list(self._callbacks):
+            if event_type in types:
+                callback(event_type=event_type, node=self, **kwargs)
+
+    def sessionId(self):
+        self._check()
+        return self._sessionId
+
+    def name(self):
+        self._check()
+        return self._name
+
+    def path(self):
+        self._check()
+        if self._parent is None:
+            return "/"
+        parent_path = self._parent.path()
+        return ("" if parent_path == "/" else parent_path) + "/" + self._name
+
+    def parent(self):
+        self._check()
+        return self._parent
+
+    def children(self):
+        self._check()
+        return tuple(self._children.values())
+
+    def node(self, relative_path):
+        node = self
+        for part in relative_path.strip("/").split("/"):
+            if part == "..":
+                node = node._parent
+            elif part and part != ".":
+                node = node._children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def isEditable(self):
+        return True
+
+    def type(self):
+        self._check()
+        return self._type
+
+    def color(self):
+        self._check()
+        return self._color
+
+    def setColor(self, color):
+        self._check()
+        self._color = color
+        self._fire(nodeEventType.AppearanceChanged)
+
+    def setName(self, name, unique_name=False):
+        self._check()
+        if name in self._parent._children:
+            raise OperationFailed("Name already in use")
+        del self._parent._children[self._name]
+        self._name = name
+        self._parent._children[name] = self
+        self._fire(nodeEventType.NameChanged)
+
+    def createNode(self, type_name, node_name=None):
+        self._check()
+        category = "Object" if self._parent is None or self.path() == "/obj" else "Sop"
+        node_name = node_name or type_name + "1"
+        node_class = ObjNode if category == "Object" else SopNode
+        node = node_class(self, node_name, nodeType(category, type_name))
+        self._children[node_name] = node
+        self._fire(nodeEventType.ChildCreated, child_node=node)
+        return node
+
+    def destroy(self):
+        self._check()
+        for child in self.children():
+            child.destroy()
+        self._fire(nodeEventType.BeingDeleted)
+        del self._parent._children[self._name]
+        del nodesById[self._sessionId]
+        self._deleted = True
+        self._parent._fire(nodeEventType.ChildDeleted, child_node=self)
+
+    def addEventCallback(self, event_types, callback):
+        self._check()
+        self._callbacks.append((tuple(event_types), callback))
+
+    def removeEventCallback(self, event_types, callback):
+        self._check()
+        entry = (tuple(event_types), callback)
+        if entry not in self._callbacks:
+            raise OperationFailed("Callback not found")
+        self._callbacks.remove(entry)
+
+    def __repr__(self):
+        return "<hz_bookmark_fakehou.Node %s>" % self.path()
+
+class ObjNode(Node):
+    def __init__(self, parent, name, node_type):
+        super().__init__(parent, name, node_type)
+        self._display = True
+
+    def isDisplayFlagSet(self):
+        return self._display
+
+    def setDisplayFlag(self, on):
+        self._display = on
+        self._fire(nodeEventType.FlagChanged)
+
+class SopNode(ObjNode):
+    def __init__(self, parent, name, node_type):
+        super().__init__(parent, name, node_type)
+        self._display = False
+        self._render = False
+        self._template = False
+        self._selectableTemplate = False
+
+    def isTemplateFlagSet(self):
+        return self._template
+
+    def isSelectableTemplateFlagSet(self):
+        return self._selectableTemplate
+
+    def setDisplayFlag(self, on):
+        # the display flag is exclusive in sop networks, the parent remembers its displayed child
+        displayed = getattr(self._parent, "_displayed", None)
+        if on and displayed is not None and displayed is not self and not displayed._deleted:
+            displayed._display = False
+            displayed._fire(nodeEventType.FlagChanged)
+        if on:
+            self._parent._displayed = self
+        super().setDisplayFlag(on)
+
+    def setRenderFlag(self, on):
+        self._render = on
+
+    def setTemplateFlag(self, on):
+        self._template = on
+        self._fire(nodeEventType.FlagChanged)
+
+    def setSelectableTemplateFlag(self, on):
+        self._selectableTemplate = on
+        self._fire(nodeEventType.FlagChanged)
+
+rootNode = Node(None, "", nodeType("Director", "root"))
+rootNode._children["obj"] = Node(rootNode, "obj", nodeType("Manager", "obj"))
+
+def root():
+    return rootNode
+
+def node(path):
+    return rootNode.node(path)
+
+def nodes(paths):
+    return tuple(node(path) for path in paths)
+
+def nodeBySessionId(session_id):
+    return nodesById.get(session_id)
+
+class NodeBundle(object):
+    def __init__(self, name):
+        self._name = name
+        self._nodes = {}
+        self._pattern = ""
+        self._filter = nodeTypeFilter.NoFilter
+
+    def name(self):
+        return self._name
+
+    def setName(self, name):
+        if name in bundles:
+            raise OperationFailed("Bundle already exists")
+        bundles[name] = bundles.pop(self._name)
+        self._name = name
+
+    def pattern(self):
+        return self._pattern
+
+    def setPattern(self, pattern):
+        self._pattern = pattern
+
+    def filter(self):
+        return self._filter
+
+    def setFilter(self, node_type_filter):
+        self._filter = node_type_filter
+
+    def nodes(self):
+        if not self._pattern:
+            return tuple(node for node in self._nodes.values() if not node._deleted)
+        return tuple(matchPattern(self._pattern))
+
+    def containsNode(self, node):
+        return node.sessionId() in self._nodes
+
+    def addNode(self, node):
+        self._nodes[node.sessionId()] = node
+
+    def removeNode(self, node):
+        self._nodes.pop(node.sessionId(), None)
+
+    def clear(self):
+        self._nodes = {}
+
+    def destroy(self):
+        del bundles[self._name]
+
+bundles = {}
+
+def nodeBundle(name):
+    return bundles.get(name)
+
+def nodeBundles():
+    return tuple(bundles.values())
+
+def addNodeBundle(name):
+    if name in bundles:
+        raise OperationFailed("Bundle already exists")
+    bundles[name] = NodeBundle(name)
+    return bundles[name]
+
+def matchPattern(pattern):
+    # space separated glob patterns over node paths, a leading ^ removes matches
+    matched = {}
+    for token in pattern.split():
+        exclude = token.startswith("^")
+        token = token.lstrip("^")
+        for candidate in allNodes(rootNode):
+            if fnmatch.fnmatchcase(candidate.path(), token):
+                if exclude:
+                    matched.pop(candidate._sessionId, None)
+                else:
+                    matched[candidate._sessionId] = candidate
+    return matched.values()
+
+def allNodes(parent):
+    for child in parent.children():
+        yield child
+        yield from allNodes(child)
+
+def clear():
+    # remove every node under /obj and every bundle
+    for child in rootNode.node("/obj").children():
+        child.destroy()
+    bundles.clear()
+
+class hipFile(object):
+    # loading a hip file builds a synthetic scene, a name like shot.2000x2x30.hip gives 2000
+    # bundled nodes below 2 levels of 30 containers. Saving only remembers the path
+    current = "untitled.hip"
+    saved = None
+
+    @staticmethod
+    def load(file_name, suppress_save_prompt=False, ignore_load_warnings=False):
+        shape = re.search(r"(\d+)x(\d+)x(\d+)", os.path.basename(file_name))
+        buildScene(*(int(n) for n in shape.groups()) if shape else (100, 2, 10))
+        hipFile.current = file_name
+
+    @staticmethod
+    def save(file_name=None):
+        hipFile.saved = file_name or hipFile.current
+
+    @staticmethod
+    def path():
+        return hipFile.current
+
+# synthetic scenes
+
+LEAF_TYPES = ("box", "null", "xform", "merge", "transform", "attribwrangle")
+LEAF_COLORS = ((0.8, 0.8, 0.8), (1.0, 0.0, 0.0), (0.0, 0.6, 1.0), (0.8, 0.8, 0.8), (1.0, 0.8, 0.0))
+
+def buildScene(count, depth=3, fanout=10, bundle_name="Bookmarks"):
+    # count bundled leaf nodes, depth levels of containers below /obj with fanout children each.
+    # Leaves are spread over the containers in order, node n goes to the container of n // fanout
+    clear()
+    bundle = addNodeBundle(bundle_name)
+    containers = {(): rootNode.node("/obj")}
+    for n in range(count):
+        key = []
+        index = n // fanout
+        for level in range(depth):
+            key.insert(0, index % fanout)
+            index //= fanout
+        key = tuple(key)
+        parent = containers.get(key)
+        if parent is None:
+            parent = containers[()]
+            for level in range(1, depth + 1):
+                child = containers.get(key[:level])
+                if child is None:
+                    prefix = "geo" if level == 1 else "subnet"
+                    child = parent.createNode(prefix, "%s%d" % (prefix, key[level - 1]))
+                    containers[key[:level]] = child
+                parent = child
+        leaf = parent.createNode(LEAF_TYPES[n % len(LEAF_TYPES)], "node%d" % n)
+        color = LEAF_COLORS[n % len(LEAF_COLORS)]
+        if color != LEAF_COLORS[0]:
+            leaf._color = Color(color)
+        bundle.addNode(leaf)
+    return bundle
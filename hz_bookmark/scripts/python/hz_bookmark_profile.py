@@ -0,0 +1,118 @@
+import json
+import time
+import functools
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from hz_bookmark_core import FLAG_GETTERS
+
+# opt-in timings and hou call counts per panel operation. While a profiler runs,
+# hou.node, hou.qt.Icon and the flag getters of the node classes are wrapped with
+# counters, they are restored once the last profiler stops
+
+COUNTERS = ("hou.node", "hou.qt.Icon", "flags")
+
+activeProfilers = []
+patches = []
+
+def countCall(key):
+    for profiler in activeProfilers:
+        for entry in profiler.stack:
+            entry["counts"][key] += 1
+
+def wrapCall(owner, name, key):
+    original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+
+    @functools.wraps(original)
+    def counted(*args, **kwargs):
+        countCall(key)
+        return original(*args, **kwargs)
+
+    setattr(owner, name, counted)
+    patches.append((owner, name, original))
+
+def installCounters(hou_module):
+    wrapCall(hou_module, "node", "hou.node")
+    qt = getattr(hou_module, "qt", None)
+    if qt is not None and hasattr(qt, "Icon"):
+        wrapCall(qt, "Icon", "hou.qt.Icon")
+    for value in list(vars(hou_module).values()):
+        if isinstance(value, type):
+            for name in FLAG_GETTERS:
+                if name in value.__dict__:
+                    wrapCall(value, name, "flags")
+
+def removeCounters():
+    while patches:
+        owner, name, original = patches.pop()
+        setattr(owner, name, original)
+
+def profiled(method):
+    # time a method of an object with a profiler attribute, a no-op while it is None
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.profiler is None:
+            return method(self, *args, **kwargs)
+        with self.profiler.operation(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class Profiler(object):
+    def __init__(self, hou_module):
+        self.hou = hou_module
+        self.stats = OrderedDict()
+        self.stack = []
+        self.running = False
+        # bumped after every finished operation, lets views refresh lazily
+        self.revision = 0
+
+    def start(self):
+        if self.running:
+            return
+        if not activeProfilers:
+            installCounters(self.hou)
+        activeProfilers.append(self)
+        self.running = True
+
+    def stop(self):
+        if not self.running:
+            return
+        activeProfilers.remove(self)
+        if not activeProfilers:
+            removeCounters()
+        self.running = False
+
+    @contextmanager
+    def operation(self, name):
+        # counts include the nested operations, times are inclusive as well
+        entry = {"counts": dict.fromkeys(COUNTERS, 0)}
+        self.stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            self.stack.pop()
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {"calls": 0, "totalMs": 0.0, "lastMs": 0.0, "maxMs": 0.0,
+                                           "last": dict.fromkeys(COUNTERS, 0), "total": dict.fromkeys(COUNTERS, 0)}
+            stat["calls"] += 1
+            stat["totalMs"] += elapsed
+            stat["lastMs"] = elapsed
+            stat["maxMs"] = max(stat["maxMs"], elapsed)
+            stat["last"] = entry["counts"]
+            for key, count in entry["counts"].items():
+                stat["total"][key] += count
+            self.revision += 1
+
+    def reset(self):
+        self.stats = OrderedDict()
+        self.revision += 1
+
+    def dump(self, path, **info):
+        # write the stats as json, info is stored next to them, e.g. the hip file
+        data = dict(info, time=time.strftime("%Y-%m-%d %H:%M:%S"), operations=self.stats)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
@@ -0,0 +1,72 @@
+import os
+import json
+import sqlite3
+
+def defaultStorePath():
+    pref_dir = os.environ.get("HOUDINI_USER_PREF_DIR") or os.path.join(os.path.expanduser("~"), "houdini")
+    return os.path.join(pref_dir, "hz_bookmark.db")
+
+class BookmarkStore(object):
+    # bookmark sets and their last known display metadata, keyed by hip file
+    def __init__(self, path=None):
+        self.path = path or defaultStorePath()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(self.path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS bundles ("
+                "hip TEXT, name TEXT, pattern TEXT, filter TEXT, "
+                "PRIMARY KEY (hip, name))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS nodes ("
+                "hip TEXT, bundle TEXT, path TEXT, member INTEGER, record TEXT, "
+                "PRIMARY KEY (hip, bundle, path))"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def hipFiles(self):
+        rows = self.connection.execute("SELECT DISTINCT hip FROM bundles ORDER BY hip")
+        return [row[0] for row in rows]
+
+    def bundles(self, hip):
+        # [(name, pattern, filter name)] stored for a hip file
+        rows = self.connection.execute("SELECT name, pattern, filter FROM bundles WHERE hip = ? ORDER BY name", (hip,))
+        return [tuple(row) for row in rows]
+
+    def saveBundle(self, hip, name, pattern, filter_name, members, records):
+        # members are the bundled paths, records map every row path to its display metadata or None
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO bundles (hip, name, pattern, filter) VALUES (?, ?, ?, ?)",
+                (hip, name, pattern or "", filter_name)
+            )
+            self.connection.execute("DELETE FROM nodes WHERE hip = ? AND bundle = ?", (hip, name))
+            members = set(members)
+            self.connection.executemany(
+                "INSERT INTO nodes (hip, bundle, path, member, record) VALUES (?, ?, ?, ?, ?)",
+                [(hip, name, path, path in members, json.dumps(record) if record else None) for path, record in records.items()]
+            )
+
+    def loadBundle(self, hip, name):
+        # returns (pattern, filter name, members, records) or None when the bundle was never stored
+        row = self.connection.execute("SELECT pattern, filter FROM bundles WHERE hip = ? AND name = ?", (hip, name)).fetchone()
+        if row is None:
+            return None
+        members = []
+        records = {}
+        for path, member, record in self.connection.execute(
+                "SELECT path, member, record FROM nodes WHERE hip = ? AND bundle = ?", (hip, name)):
+            if member:
+                members.append(path)
+            records[path] = json.loads(record) if record else None
+        return (row[0], row[1], members, records)
+
+    def removeBundle(self, hip, name):
+        with self.connection:
+            self.connection.execute("DELETE FROM bundles WHERE hip = ? AND name = ?", (hip, name))
+            self.connection.execute("DELETE FROM nodes WHERE hip = ? AND bundle = ?", (hip, name))